@@ -1,11 +1,3 @@
-try:
-    from langchain_huggingface import HuggingFaceEmbeddings
-except ImportError:
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-from transformers import AutoTokenizer
-
-from sentence_transformers import SentenceTransformer
-from app.utils.CustomEmbedding import CustomEmbedding
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -44,12 +36,33 @@ CACHE_TTL_EMBEDDINGS = int(os.getenv("CACHE_TTL_EMBEDDINGS", "86400"))  # 24 hou
 CACHE_TTL_RESPONSES = int(os.getenv("CACHE_TTL_RESPONSES", "3600"))     # 1 hour
 CACHE_TTL_DOCUMENTS = int(os.getenv("CACHE_TTL_DOCUMENTS", "7200"))    # 2 hours
 CACHE_TTL_CHAT_HISTORY = int(os.getenv("CACHE_TTL_CHAT_HISTORY", "1800"))  # 30 minutes
+CACHE_TTL_OCR = int(os.getenv("CACHE_TTL_OCR", "604800"))  # 7 days
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")) * 1024 * 1024  # In-process tier, per process
+EMBEDDING_CACHE_REDIS = os.getenv("EMBEDDING_CACHE_REDIS", "true").lower() == "true"  # Share embeddings between processes and hosts
 
 # AI Model Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L12-v2")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "multi-qa-MiniLM-L6-cos-v1")
 LLM_MODEL = os.getenv("LLM_MODEL", "deepseek-r1-distill-llama-70b")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.6"))
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "false").lower() == "true"  # Load the tokenizer and embedder at startup instead of on first use
+# Context windows of the Groq models we deploy with. Retrieved context is packed
+# into half of it (capped), leaving room for the prompt, chat history and answer.
+# Chunk token counts come from MODEL_NAME's tokenizer, close to the LLM's own.
+LLM_CONTEXT_WINDOWS = {
+    "deepseek-r1-distill-llama-70b": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "gemma2-9b-it": 8192,
+}
+LLM_CONTEXT_BUDGET = int(os.getenv(
+    "LLM_CONTEXT_BUDGET",
+    str(min(16000, LLM_CONTEXT_WINDOWS.get(LLM_MODEL, 8192) // 2))
+))  # Tokens of document context per LLM call
 
 # Security Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
@@ -67,24 +80,66 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 # File Upload Configuration
 UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads/")
 ALLOWED_EXTENSIONS = {
-    "pdf", "doc", "docx", "txt", "csv", "xls", "xlsx",
+    "pdf", "doc", "docx", "pptx", "txt", "csv", "xls", "xlsx",
     "png", "jpg", "jpeg", "tif", "tiff", "bmp", "webp"
 }
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "200"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024")) * 1024  # Read size when spooling uploads
+CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", "2"))  # Concurrent upload conversions (image -> PDF, .xls -> CSV)
+UPLOAD_PART_SIZE = max(5, int(os.getenv("UPLOAD_PART_SIZE_MB", "16"))) * 1024 * 1024  # MinIO multipart part size (S3 minimum 5MB)
+
+# Document Processing Configuration
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_ENCODE_BATCH_SIZE = int(os.getenv("EMBEDDING_ENCODE_BATCH_SIZE", "32"))  # Chunks per forward pass, grouped by token length
+EMBEDDING_TORCH_THREADS = int(os.getenv("EMBEDDING_TORCH_THREADS", "0"))  # torch intra-op threads, 0 = torch default
+QUERY_EMBED_MAX_BATCH = int(os.getenv("QUERY_EMBED_MAX_BATCH", "32"))  # Concurrent questions embedded in one forward pass
+QUERY_EMBED_WAIT_MS = float(os.getenv("QUERY_EMBED_WAIT_MS", "5"))  # How long a question waits for others to batch with
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+PROCESSING_WORKERS = int(os.getenv("PROCESSING_WORKERS", "2"))
+PROCESSING_MAX_PENDING_JOBS = int(os.getenv("PROCESSING_MAX_PENDING_JOBS", "50"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))  # 1 hour
+JOB_SSE_POLL_INTERVAL = float(os.getenv("JOB_SSE_POLL_INTERVAL", "0.5"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))  # Batches buffered between ingestion pipeline stages
+INGEST_UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", "2"))  # Concurrent Qdrant upsert threads per document
+
+# PDF Loading Configuration
+PDF_DOWNLOAD_PART_SIZE = int(os.getenv("PDF_DOWNLOAD_PART_SIZE_MB", "16")) * 1024 * 1024
+PDF_DOWNLOAD_CONCURRENCY = int(os.getenv("PDF_DOWNLOAD_CONCURRENCY", "4"))
+PDF_PAGE_WINDOW = int(os.getenv("PDF_PAGE_WINDOW", "32"))  # Pages parsed/indexed per batch
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) - 1)))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))  # Smaller documents are extracted serially
+PDF_EXTRACTOR_BACKEND = os.getenv("PDF_EXTRACTOR_BACKEND", "pypdf").lower()  # pypdf, pdfminer, pdfium or pymupdf
+
+# Spreadsheet Loading Configuration (XLSX/CSV rows are indexed in batches that repeat the header)
+SPREADSHEET_BATCH_ROWS = int(os.getenv("SPREADSHEET_BATCH_ROWS", "50"))
+SPREADSHEET_BATCH_CHARS = int(os.getenv("SPREADSHEET_BATCH_CHARS", "2000"))  # Keep under the chunk size so batches are never split
+TABULAR_QUERY_ENABLED = os.getenv("TABULAR_QUERY_ENABLED", "true").lower() == "true"  # Answer aggregate questions from Parquet tables
+TABULAR_MAX_RESULT_ROWS = int(os.getenv("TABULAR_MAX_RESULT_ROWS", "50"))  # Result rows sent to the LLM
+TABULAR_CACHE_TABLES = int(os.getenv("TABULAR_CACHE_TABLES", "8"))  # Parquet sheets kept in memory per process
+
+# OCR Configuration
+OCR_PAGE_FALLBACK = os.getenv("OCR_PAGE_FALLBACK", "true").lower() == "true"
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "25"))  # Pages with less extracted text are OCR'd
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "cache/ocr")
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_MB", "512")) * 1024 * 1024
+OCR_CACHE_REDIS = os.getenv("OCR_CACHE_REDIS", "false").lower() == "true"  # Share OCR results between hosts
+OCR_WARMUP = os.getenv("OCR_WARMUP", "false").lower() == "true"  # Load OCR engines at startup instead of on first use
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) - 1)))))  # OCR processes, 1 = in-process
+
+# Job Queue Configuration ("local" runs jobs in the API process, "postgres" hands them to worker.py)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local").lower()
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
 
 
 # CORS Configuration
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://192.168.22.1:3000").split(",")
 
-model = SentenceTransformer(EMBEDDING_MODEL)
-
-encoder = HuggingFaceEmbeddings(
-    model_name=MODEL_NAME, 
-    model_kwargs={"device": "cpu"}
-)
-
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-
+# Tokenizer and embedder are loaded on first use by app.utils.model_registry
 
 
 class Settings(BaseSettings):
@@ -64,6 +64,31 @@ def create_database_indexes():
         log_error(e, context="database_indexes")
 
 
+def upgrade_schema():
+    """Add columns introduced after the tables were first created (create_all never alters existing tables)"""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("""
+                ALTER TABLE uploaded_files ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+            """))
+            
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_uploaded_files_content_hash 
+                ON uploaded_files(content_hash);
+            """))
+            
+            # Workers claim the oldest due job; lets that query skip finished jobs
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_processing_jobs_claim 
+                ON processing_jobs(status, available_at, created_at);
+            """))
+            
+            connection.commit()
+            
+    except Exception as e:
+        log_error(e, context="database_schema")
+
+
 # Database connection monitoring
 @event.listens_for(engine, "connect")
 def receive_connect(dbapi_connection, connection_record):
@@ -79,6 +104,7 @@ def receive_checkin(dbapi_connection, connection_record):
 
 # Create tables and indexes
 Base.metadata.create_all(bind=engine)
+upgrade_schema()
 #create_database_indexes()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime 
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text 
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -38,6 +38,8 @@ class UploadedFile(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     upload_date = Column(DateTime, default=datetime.utcnow)  
     file_size = Column(Integer)  
+    # SHA-256 of the uploaded bytes: identical uploads share one stored object and one vector collection
+    content_hash = Column(String(64), index=True, nullable=True)
 
     owner = relationship("User", back_populates="uploaded_files")
     chats = relationship("Chat", back_populates="uploaded_file")
@@ -62,6 +64,29 @@ class Chat(Base):
 
     def get_source(self):
         return json.loads(self.source) if self.source else []
+
+
+class ProcessingJobRecord(Base):
+    """Durable document processing job, leased by worker nodes with FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "processing_jobs"
+    id = Column(String, primary_key=True)
+    file_id = Column(Integer, ForeignKey("uploaded_files.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    status = Column(String, index=True, default="queued")
+    stage = Column(String, nullable=True)
+    progress = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    version = Column(Integer, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    available_at = Column(DateTime, default=func.now())  # Earliest time a (re)try may start
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
     
     
     
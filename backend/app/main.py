@@ -1,6 +1,4 @@
-# New Dependency 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from transformers import AutoTokenizer
+import sys
 from typing import Optional
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -63,6 +61,19 @@ async def startup_event():
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         log_info("Database connection established", context="startup")
+
+        from app.config import OCR_WARMUP, OCR_WORKERS
+        if OCR_WARMUP:
+            # Off the event loop: startup shouldn't wait for the OCR models
+            import threading
+            from app.services.ocr_service import warm_up_ocr
+            threading.Thread(target=warm_up_ocr, args=(OCR_WORKERS,), name="ocr-warmup", daemon=True).start()
+
+        from app.config import MODEL_WARMUP
+        if MODEL_WARMUP:
+            import threading
+            from app.utils.model_registry import warm_up_models
+            threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
         
 
     except Exception as e:
@@ -77,6 +88,22 @@ async def shutdown_event():
         from app.db.database import engine
         engine.dispose()
         log_info("Database connections closed", context="shutdown")
+
+        # Stop accepting document processing jobs
+        from app.services.job_service import job_manager
+        job_manager.shutdown(wait=False)
+        log_info("Processing job workers stopped", context="shutdown")
+
+        from app.utils.pdf_extraction import shutdown_extraction_pool
+        shutdown_extraction_pool()
+
+        from app.services.upload_service import shutdown_conversion_pool
+        shutdown_conversion_pool()
+
+        # Only if OCR was used: importing the service just to stop its pool would load the OCR stack
+        ocr_module = sys.modules.get("app.services.ocr_service")
+        if ocr_module is not None:
+            ocr_module.shutdown_ocr_pool()
     except Exception as e:
         log_error(e, context="shutdown")
 
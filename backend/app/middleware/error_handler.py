@@ -36,6 +36,9 @@ class ValidationException(CustomHTTPException):
     def __init__(self, detail: str, context: Dict[str, Any] = None):
         super().__init__(status_code=400, detail=detail, error_code="VALIDATION_ERROR", context=context)
 
+class ProcessingCancelled(Exception):
+    """Raised by a progress callback to stop document processing, e.g. once a worker lost the job's lease"""
+
 def create_error_response(
     status_code: int,
     message: str,
@@ -8,10 +8,13 @@ from app.db.models import Chat, UploadedFile
 from app.utils.auth import get_current_user
 from app.db.database import get_db
 from app.services.chat_service import generate_response, generate_multi_document_response
-from app.services.document_service import retrieved_docs
+from app.services.document_service import retrieved_docs, embed_question
+from app.services.tabular_service import answer_from_tables
+from app.config import LLM_CONTEXT_BUDGET
 from app.middleware.error_handler import ValidationException, DatabaseException, FileProcessingException
 from app.middleware.error_handler import get_request_id
 from app.utils.logger import log_info, log_error, log_warning, log_performance
+import asyncio
 import time
 
 router = APIRouter()
@@ -134,11 +137,30 @@ async def chat_with_multiple_documents(
         # Collect contexts from all documents
         all_contexts = []
         document_names = []
+        # One embedding of the question serves every document; off the event loop so
+        # concurrent requests can be batched together
+        try:
+            question_vector = await asyncio.to_thread(embed_question, question)
+        except Exception as e:
+            log_error(
+                e,
+                context="multi_document_question_embedding",
+                request_id=request_id,
+                user_id=user_id
+            )
+            raise FileProcessingException(f"Failed to embed the question: {str(e)}", {"file_ids": file_ids})
         
         for file in files:
             try:
                 # Use token-limited retrieval for each document
-                context = retrieved_docs(question, file.embedding_path, max_tokens=5000)  # Reduced for multi-doc
+                # The documents share one context budget
+                context = await asyncio.to_thread(
+                    retrieved_docs,
+                    question,
+                    file.embedding_path,
+                    max_tokens=LLM_CONTEXT_BUDGET // len(files),
+                    question_vector=question_vector
+                )
                 if isinstance(context, list):  # If retrieved_docs returns a list of documents
                     all_contexts.extend(context)
                 else:
@@ -407,8 +429,13 @@ async def chat_with_file(
         message_history = await get_file_messages(file_id, user_id, db, request_id)
         
         try:
-            # Use token-limited retrieval to avoid hitting Groq limits
-            context = retrieved_docs(question, file.embedding_path, max_tokens=10000)
+            # Aggregate questions about spreadsheets are computed locally; the LLM only sees the result table.
+            # Off the event loop: it reads Parquet from MinIO and waits on the planning LLM call
+            context = await asyncio.to_thread(answer_from_tables, question, file.file_path)
+            if context is None:
+                # Use token-limited retrieval to avoid hitting Groq limits; in a thread so the
+                # question embedding can be batched with other requests
+                context = await asyncio.to_thread(retrieved_docs, question, file.embedding_path, max_tokens=LLM_CONTEXT_BUDGET)
             response = await generate_response(
                 file.file_name.split('.')[0][:15], 
                 question, 
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status, Request, Body
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from bs4 import BeautifulSoup
 import aiohttp
+import asyncio
 import os
 import shutil
 import pandas as pd
@@ -10,7 +11,6 @@ from datetime import datetime, timedelta
 import tempfile
 import requests
 from typing import Dict, List
-from docx2pdf import convert
 # pptxtopdf is Windows-only, using alternative for Linux
 # from pptxtopdf import convert as convertPPTX
 def convertPPTX(pptx_path, pdf_path):
@@ -18,12 +18,24 @@ def convertPPTX(pptx_path, pdf_path):
     print(f"PPTX to PDF conversion not available on Linux: {pptx_path} -> {pdf_path}")
     return False
 from app.db.database import get_db
-from app.db.models import UploadedFile, User, Chat
+from app.db.models import UploadedFile, User, Chat, ProcessingJobRecord
 from app.utils.file_utils import sanitize_filename
 from app.utils.converters import PPTtoPDF
 from app.utils.auth import get_current_user
-from app.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB
-from app.services.document_service import process_document_qdrant  
+from app.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB, JOB_SSE_POLL_INTERVAL, UPLOAD_CHUNK_SIZE
+from app.services.processing_service import process_uploaded_file
+from app.services.job_service import get_job_backend, JobStatus
+from app.services.tabular_service import remove_table_store
+from app.services.upload_service import (
+    MAX_FILE_SIZE_BYTES,
+    FileTooLargeException,
+    spool_upload,
+    convert_upload,
+    content_object_name,
+    find_by_content_hash,
+    object_exists,
+    store_object
+)
 from app.utils.minio import initialize_minio 
 from app.config import MINIO_BUCKET_NAME
 from minio import Minio
@@ -59,198 +71,13 @@ async def process_file(
     request_id = get_request_id(request)
     
     try:
-        log_info(
-            "Document processing started",
-            context="document_process",
-            request_id=request_id,
-            file_id=file_id,
-            user_id=user_id
-        )
-        
-        uploaded_file = db.query(UploadedFile).filter(UploadedFile.id == file_id).first()
-        if not uploaded_file:
-            log_warning(
-                "File not found for processing",
-                context="document_process",
-                request_id=request_id,
-                file_id=file_id,
-                user_id=user_id
-            )
-            raise ValidationException("File not found", {"file_id": file_id})
-        
-        if uploaded_file.file_type.lower() not in ALLOWED_EXTENSIONS:
-            log_warning(
-                "Unsupported file type for processing",
-                context="document_process",
-                request_id=request_id,
-                file_id=file_id,
-                file_type=uploaded_file.file_type
-            )
-            raise ValidationException("Unsupported file type", {"file_type": uploaded_file.file_type})
-        
-        if not uploaded_file.file_path or not uploaded_file.file_path.startswith('/minio/'):
-            log_warning(
-                "Invalid file path format",
-                context="document_process",
-                request_id=request_id,
-                file_id=file_id,
-                file_path=uploaded_file.file_path
-            )
-            raise ValidationException("Invalid file path format", {"file_path": uploaded_file.file_path})
-        
-        bucket_name, object_name = parse_minio_path(uploaded_file.file_path)
-
-        # Verify object exists in MinIO before downloading
-        try:
-            minio_client.stat_object(bucket_name, object_name)
-            log_info(
-                "File found in MinIO storage",
-                context="document_process",
-                request_id=request_id,
-                bucket_name=bucket_name,
-                object_name=object_name
-            )
-        except S3Error as e:
-            log_error(
-                e,
-                context="minio_storage",
-                request_id=request_id,
-                bucket_name=bucket_name,
-                object_name=object_name
-            )
-            raise FileProcessingException(f"File not found in storage: {str(e)}", {"bucket": bucket_name, "object": object_name})
-
-
-
-        # Load the document
-        try:
-            loader = MinIOPyMuPDFLoader(minio_client, bucket_name, object_name)
-            documents = loader.load()
-            log_info(
-                "Document loaded successfully",
-                context="document_process",
-                request_id=request_id,
-                num_documents=len(documents)
-            )
-        except Exception as e:
-            log_error(
-                e,
-                context="document_loading",
-                request_id=request_id,
-                file_id=file_id
-            )
-            raise FileProcessingException(f"Failed to load document: {str(e)}", {"file_id": file_id})
-
-
-        try:
-            result = await process_document_qdrant(
-                documents, 
-                db_path=None
-            ) 
-            uploaded_file.embedding_path = result["collection"]  
-            db.commit()
-            log_info(
-                "Document processed with Qdrant successfully",
-                context="document_process",
-                request_id=request_id,
-                collection=result["collection"],
-                points_inserted=result["points_inserted"]
-            )
-        except Exception as e:
-            log_error(
-                e,
-                context="qdrant_processing",
-                request_id=request_id,
-                file_id=file_id
-            )
-            raise FileProcessingException(f"Failed to process document: {str(e)}", {"file_id": file_id})
-
-        # Generate summary and questions
-        try: 
-            short_name = uploaded_file.file_name.split('.')[0][:15]
-            # Use token-limited retrieval to avoid hitting Groq limits
-            context = retrieved_docs("give me please summary for the document", uploaded_file.embedding_path, max_tokens=10000)
-
-            # Check if context is a string (error message) or list of documents
-            if isinstance(context, str):
-                log_warning(
-                    f"Document retrieval returned error: {context}",
-                    context="document_process",
-                    request_id=request_id,
-                    file_id=file_id
-                )
-                summary = f"Unable to generate summary: {context}"
-                questions = [f"Unable to generate questions: {context}"]
-            else:
-                summary = await generate_summary(short_name, context)
-                questions = await generate_questions(short_name, context)
-            
-            log_info(
-                "Summary and questions generated",
-                context="document_process",
-                request_id=request_id,
-                summary_length=len(summary),
-                questions_count=len(questions) if isinstance(questions, list) else 0
-            )
-        
-        except Exception as e:
-            log_error(
-                e,
-                context="ai_generation",
-                request_id=request_id,
-                file_id=file_id
-            )
-            raise FileProcessingException(f"Failed to generate response: {str(e)}", {"file_id": file_id})
-
-        # Save to database
-        try:
-            db.add(Chat(
-                response=summary,
-                user_id=user_id,
-                uploaded_file_id=file_id,
-                created_at_response=datetime.now()
-            ))
-
-            db.add(Chat(
-                response=json.dumps(questions),  
-                user_id=user_id,
-                uploaded_file_id=file_id,
-                created_at_response=datetime.now()
-            ))
-
-            db.commit()
-            log_info(
-                "Chat records saved to database",
-                context="document_process",
-                request_id=request_id,
-                user_id=user_id,
-                file_id=file_id
-            )
-        except Exception as e:
-            log_error(
-                e,
-                context="database_save",
-                request_id=request_id,
-                user_id=user_id,
-                file_id=file_id
-            )
-            raise DatabaseException("Failed to save chat records", {"user_id": user_id, "file_id": file_id})
-
-
+        result = await process_uploaded_file(file_id, user_id, db, request_id=request_id)
 
         duration = time.time() - start_time
-        log_performance(
-            "Document processing completed",
-            duration,
-            request_id=request_id,
-            file_id=file_id,
-            user_id=user_id
-        )
-
         return {
             "message": "File processed and stored in Qdrant successfully",
-            "summary": summary, 
-            "questions": questions,
+            "summary": result["summary"], 
+            "questions": result["questions"],
             "processing_time": f"{duration:.2f}s"
         }
 
@@ -271,14 +98,95 @@ async def process_file(
 
 
 
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_processing_job(
+    request: Request,
+    file_id: int = Body(..., embed=True),
+    user_id: int = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a file for background processing and return the job id right away"""
+    request_id = get_request_id(request)
+
+    uploaded_file = db.query(UploadedFile).filter(
+        UploadedFile.owner_id == user_id,
+        UploadedFile.id == file_id
+    ).first()
+    if not uploaded_file:
+        raise ValidationException("File not found", {"file_id": file_id})
+
+    job = get_job_backend().submit(file_id, user_id)
+    log_info(
+        "Document processing job submitted",
+        context="document_jobs",
+        request_id=request_id,
+        job_id=job["job_id"],
+        file_id=file_id,
+        user_id=user_id
+    )
+    return job
+
+
+def _get_user_job(job_id: str, user_id: int):
+    job = get_job_backend().get_job(job_id)
+    if job is None or job["user_id"] != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_processing_job(job_id: str, user_id: int = Depends(get_current_user)):
+    return _get_user_job(job_id, user_id)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_processing_job(request: Request, job_id: str, user_id: int = Depends(get_current_user)):
+    """Server-sent events stream of job progress, closed once the job finishes"""
+    _get_user_job(job_id, user_id)
+    backend = get_job_backend()
+
+    async def event_stream():
+        last_version = -1
+        last_sent = time.time()
+        while True:
+            if await request.is_disconnected():
+                break
+            snapshot = await asyncio.to_thread(backend.get_job, job_id)
+            if snapshot is None:
+                break
+            if snapshot["version"] != last_version:
+                last_version = snapshot["version"]
+                last_sent = time.time()
+                finished = snapshot["status"] in JobStatus.TERMINAL
+                event = "done" if finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+                if finished:
+                    break
+            elif time.time() - last_sent > 15:
+                # Keep proxies from closing an idle connection
+                last_sent = time.time()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(JOB_SSE_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+
+
 
 
 @router.post("/upload")
 async def upload_file(
+    request: Request,
     file: UploadFile = File(...), 
     user_id: int = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
+    spooled = None
     try:
         
         file_extension = file.filename.split(".")[-1].lower()
@@ -288,72 +196,64 @@ async def upload_file(
                 detail=f"Unsupported file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
             )
 
-        
-        file_content = await file.read()
-        file_size_bytes = len(file_content)
-        file_size_mb = file_size_bytes / (1024 * 1024)
-        if file_size_mb > MAX_FILE_SIZE_MB:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE_MB}MB"
-            )
+        # Reject obviously oversized requests before reading anything (allowing for multipart overhead)
+        content_length = int(request.headers.get("content-length") or 0)
+        if content_length > MAX_FILE_SIZE_BYTES + UPLOAD_CHUNK_SIZE:
+            raise FileTooLargeException(content_length)
 
+        # Spool to disk in chunks: size is enforced and the hash computed as bytes arrive
+        spooled = await spool_upload(file)
+        file_size_bytes = spooled.size
 
         sanitized_filename = sanitize_filename(file.filename)
-        object_name = f"{user_id}/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{sanitized_filename}"
 
-        # Convert images to PDF
-        if file_extension in ["png", "jpg", "jpeg", "tif", "tiff", "bmp", "webp"]:
+        # The same user uploading the same bytes again gets their existing record back
+        own_copy = find_by_content_hash(db, spooled.sha256, owner_id=user_id)
+        if own_copy is not None:
+            log_info("Duplicate upload for user, returning existing file", context="upload", user_id=user_id, file_id=own_copy.id)
+            return {
+                "message": "File already uploaded",
+                "duplicate": True,
+                "file": {
+                    "id": own_copy.id,
+                    "name": own_copy.file_name,
+                    "type": own_copy.file_type,
+                    "url": own_copy.file_path,
+                    "size": own_copy.file_size,
+                    "upload_date": own_copy.upload_date.isoformat()
+                }
+            }
+
+        # Known content uploaded by someone else: reference the stored object, no conversion or upload
+        known = find_by_content_hash(db, spooled.sha256)
+        if known is not None:
+            file_url = known.file_path
+            file_extension = known.file_type.lower()
+            file_size_bytes = known.file_size
+            log_info("Upload matches stored content, reusing object", context="upload", user_id=user_id, file_path=file_url)
+        else:
+            # Convert images to PDF and legacy .xls to CSV; Office formats are stored as uploaded
             try:
-                image = Image.open(io.BytesIO(file_content)).convert("RGB")
-                pdf_bytes_io = io.BytesIO()
-                image.save(pdf_bytes_io, format="PDF")
-                file_content = pdf_bytes_io.getvalue()
-                file_size_bytes = len(file_content)
-                object_name = f"{object_name.rsplit('.', 1)[0]}.pdf"
-                file_extension = 'pdf'
-            except Exception as img_err:
+                stored_path, file_extension = await convert_upload(spooled, file_extension)
+            except Exception as convert_err:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Failed to convert image to PDF: {str(img_err)}"
+                    detail=f"Failed to convert {file_extension.upper()} file: {str(convert_err)}"
                 )
 
-        # Convert DOCX to PDF
-        if file_extension == 'docx':
-            pdf_content = io.BytesIO()
-            with io.BytesIO(file_content) as docx_file:
-                convert(docx_file, pdf_content)
-            file_content = pdf_content.getvalue()
-            file_size_bytes = len(file_content)  # Update size after conversion
-            object_name = f"{object_name.rsplit('.', 1)[0]}.pdf"
-            file_extension = 'pdf'
-
-        # Convert Excel to CSV
-        elif file_extension in ['xlsx', 'xls']:
-            excel_file = io.BytesIO(file_content)
-            df = pd.read_excel(excel_file)
-            csv_content = io.StringIO()
-            df.to_csv(csv_content, index=False)
-            file_content = csv_content.getvalue().encode('utf-8')
-            file_size_bytes = len(file_content)  # Update size after conversion
-            object_name = f"{object_name.rsplit('.', 1)[0]}.csv"
-            file_extension = 'csv'
-
-        # Upload to MinIO
-        try:
-            minio_client.put_object(
-                MINIO_BUCKET_NAME,
-                object_name,
-                io.BytesIO(file_content),
-                length=file_size_bytes
-            )
-        except S3Error as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload to MinIO: {str(e)}"
-            )
-
-        file_url = f"/minio/{MINIO_BUCKET_NAME}/{object_name}"
+            # Upload to MinIO under a content-addressed name
+            object_name = content_object_name(spooled.sha256, file_extension)
+            try:
+                if object_exists(object_name):
+                    file_size_bytes = os.path.getsize(stored_path)
+                else:
+                    file_size_bytes = store_object(stored_path, object_name)
+            except S3Error as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to upload to MinIO: {str(e)}"
+                )
+            file_url = f"/minio/{MINIO_BUCKET_NAME}/{object_name}"
 
         # Save in DB
         db_file = UploadedFile(
@@ -363,6 +263,7 @@ async def upload_file(
             embedding_path=None,
             owner_id=user_id,
             file_size=file_size_bytes,
+            content_hash=spooled.sha256,
             upload_date=datetime.utcnow()  
         )
         db.add(db_file)
@@ -388,6 +289,9 @@ async def upload_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
+    finally:
+        if spooled is not None:
+            spooled.cleanup()
 
 
 
@@ -479,11 +383,16 @@ def delete_file(file_id: int, user_id: int = Depends(get_current_user), db: Sess
                 detail="File not found"
             )
         
-        # Delete from MinIO if file path exists and is a MinIO path
-        if file.file_path and file.file_path.startswith('/minio/'):
+        # Delete from MinIO if file path exists and is a MinIO path, unless other uploads share the object
+        shared = file.file_path is not None and db.query(UploadedFile).filter(
+            UploadedFile.file_path == file.file_path,
+            UploadedFile.id != file.id
+        ).first() is not None
+        if file.file_path and file.file_path.startswith('/minio/') and not shared:
             bucket_name, object_name = parse_minio_path(file.file_path)
             try:
                 minio_client.remove_object(bucket_name, object_name)
+                remove_table_store(bucket_name, object_name)
             except S3Error as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -491,8 +400,9 @@ def delete_file(file_id: int, user_id: int = Depends(get_current_user), db: Sess
                 )
                 
         
-        # Delete related messages
+        # Delete related messages and queued processing jobs
         db.query(Chat).filter(Chat.uploaded_file_id == file_id).delete(synchronize_session=False)
+        db.query(ProcessingJobRecord).filter(ProcessingJobRecord.file_id == file_id).delete(synchronize_session=False)
         
         # Delete the file record from database
         db.delete(file)
@@ -8,7 +8,14 @@ from app.config import qdrant_client
 from app.utils.minio import initialize_minio
 from app.middleware.performance import get_performance_summary, get_system_stats
 from app.middleware.error_handler import get_request_id
+from app.services.job_service import get_job_backend
+from app.services.upload_service import conversion_stats
+from app.services.tabular_service import tabular_stats
+from app.services.document_service import ingestion_stats, query_embedder
+from app.services.embedding_cache import embedding_cache
+from app.utils.model_registry import model_registry
 from app.utils.logger import log_info, log_error
+import sys
 import time
 import psutil
 
@@ -176,6 +183,8 @@ async def metrics_endpoint(request: Request):
         
         # Application metrics
         process = psutil.Process()
+        # Embedding counters exist only once the embedder has been loaded in this process
+        embedder = model_registry.peek("embedding_engine")
         
         metrics = {
             "system": {
@@ -190,7 +199,18 @@ async def metrics_endpoint(request: Request):
                 "memory_rss": process.memory_info().rss,
                 "cpu_percent": process.cpu_percent(),
                 "num_threads": process.num_threads()
-            }
+            },
+            "processing_jobs": get_job_backend().stats(),
+            "ingestion": ingestion_stats(),
+            "models": model_registry.stats(),
+            "embedding": embedder.stats() if embedder is not None else None,
+            "embedding_cache": embedding_cache.stats(),
+            "query_embedding": query_embedder.stats(),
+            "conversions": conversion_stats(),
+            "tabular_queries": tabular_stats(),
+            # OCR counters exist only once a scanned page has been processed in this process
+            "ocr": sys.modules["app.services.ocr_service"].ocr_service.stats()
+                   if "app.services.ocr_service" in sys.modules else None
         }
         
         return JSONResponse(content=metrics)
@@ -11,13 +11,13 @@ from langchain_qdrant import Qdrant
 
 from app.utils.prompt import custom_prompt_template, custom_summary_prompt_template, custom_question_extraction_prompt_template
 from app.utils.CustomEmbedding import CustomEmbedding
-from app.config import encoder, llm, qdrant_client
+from app.config import llm, qdrant_client, LLM_CONTEXT_BUDGET
 from app.utils.logger import log_info, log_error, log_warning, log_performance
 import re
 import time
 warnings.filterwarnings("ignore", message="langchain is deprecated.", category=DeprecationWarning)
 
-from app.services.document_service import retrieved_docs
+from app.services.document_service import retrieved_docs, document_token_counts, pack_documents
 
 
 def clean_response(response: str) -> str:
@@ -191,25 +191,23 @@ async def generate_summary(
         )
         
         # Check if context is too large and needs chunking
-        total_chars = sum(len(doc.page_content) for doc in context)
-        estimated_tokens = total_chars // 4
+        total_tokens = sum(document_token_counts(context))
         
         log_info(
-            f"Context token estimation for summary",
+            f"Context token count for summary",
             context="ai_summary",
             index=index,
-            total_chars=total_chars,
-            estimated_tokens=estimated_tokens,
+            total_tokens=total_tokens,
             num_documents=len(context),
-            threshold=15000
+            threshold=LLM_CONTEXT_BUDGET
         )
         
-        if estimated_tokens > 15000:
+        if total_tokens > LLM_CONTEXT_BUDGET:
             log_warning(
-                f"Context too large ({estimated_tokens} tokens), using chunked processing",
+                f"Context too large ({total_tokens} tokens), using chunked processing",
                 context="ai_summary",
                 index=index,
-                estimated_tokens=estimated_tokens
+                total_tokens=total_tokens
             )
             return await generate_summary_chunked(index, context, language)
         
@@ -281,20 +279,20 @@ async def generate_summary_chunked(
     index: str,
     context: List[Document],
     language: str = "Auto-detect",
-    chunk_size: int = 10  # Number of documents per chunk
+    max_tokens: int = LLM_CONTEXT_BUDGET  # Token budget of each chunk
 ):
     """Generate summary by processing large documents in chunks"""
     try:
+        # Split context into as few chunks as fit the budget
+        chunks = pack_documents(context, max_tokens)
+        
         log_info(
             "Starting chunked summary generation",
             context="ai_summary_chunked",
             index=index,
-            total_chunks=len(context) // chunk_size + 1
+            total_chunks=len(chunks)
         )
         
-        # Split context into chunks
-        chunks = [context[i:i + chunk_size] for i in range(0, len(context), chunk_size)]
-        
         summaries = []
         for i, chunk in enumerate(chunks):
             log_info(
@@ -423,25 +421,23 @@ async def generate_questions(
         )
         
         # Check if context is too large and needs chunking
-        total_chars = sum(len(doc.page_content) for doc in context)
-        estimated_tokens = total_chars // 4
+        total_tokens = sum(document_token_counts(context))
         
         log_info(
-            f"Context token estimation for questions",
+            f"Context token count for questions",
             context="ai_questions",
             index=index,
-            total_chars=total_chars,
-            estimated_tokens=estimated_tokens,
+            total_tokens=total_tokens,
             num_documents=len(context),
-            threshold=15000
+            threshold=LLM_CONTEXT_BUDGET
         )
         
-        if estimated_tokens > 15000:
+        if total_tokens > LLM_CONTEXT_BUDGET:
             log_warning(
-                f"Context too large ({estimated_tokens} tokens), using chunked processing for questions",
+                f"Context too large ({total_tokens} tokens), using chunked processing for questions",
                 context="ai_questions",
                 index=index,
-                estimated_tokens=estimated_tokens
+                total_tokens=total_tokens
             )
             return await generate_questions_chunked(index, context, language)
         
@@ -537,20 +533,20 @@ async def generate_questions_chunked(
     index: str,
     context: List[Document],
     language: str = "Auto-detect",
-    chunk_size: int = 10  # Number of documents per chunk
+    max_tokens: int = LLM_CONTEXT_BUDGET  # Token budget of each chunk
 ):
     """Generate questions by processing large documents in chunks"""
     try:
+        # Split context into as few chunks as fit the budget
+        chunks = pack_documents(context, max_tokens)
+        
         log_info(
             "Starting chunked question generation",
             context="ai_questions_chunked",
             index=index,
-            total_chunks=len(context) // chunk_size + 1
+            total_chunks=len(chunks)
         )
         
-        # Split context into chunks
-        chunks = [context[i:i + chunk_size] for i in range(0, len(context), chunk_size)]
-        
         all_questions = []
         for i, chunk in enumerate(chunks):
             log_info(
@@ -1,5 +1,7 @@
 import warnings
 import aiohttp
+import asyncio
+import threading
 import time
 warnings.filterwarnings(
     "ignore", message="langchain is deprecated.", category=DeprecationWarning
@@ -14,7 +16,7 @@ from langchain_community.document_loaders import (
     UnstructuredHTMLLoader,
     UnstructuredFileLoader,
 )
-from uuid import uuid4
+from uuid import uuid4, uuid5, NAMESPACE_URL
 from langchain.schema import Document
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -23,7 +25,6 @@ from langchain_community.vectorstores.utils import DistanceStrategy
 from fastapi import HTTPException
 import tempfile
 from langchain_community.document_loaders import PyPDFLoader
-from app.config import (tokenizer, encoder)
 from langchain_community.vectorstores import Chroma
 
 from langchain_qdrant import Qdrant
@@ -32,9 +33,35 @@ from langchain_qdrant import Qdrant
 # from pptxtopdf import convert as convertPPTX
 
 from qdrant_client.http import models
-from app.config import encoder, qdrant_client
+from app.config import (
+    qdrant_client,
+    EMBEDDING_BATCH_SIZE,
+    QDRANT_UPSERT_BATCH_SIZE,
+    LLM_CONTEXT_BUDGET,
+    PDF_PAGE_WINDOW,
+    INGEST_QUEUE_SIZE,
+    INGEST_UPSERT_WORKERS,
+    QUERY_EMBED_MAX_BATCH,
+    QUERY_EMBED_WAIT_MS,
+)
+from app.services.embedding_cache import embedding_cache
+from app.utils.chunking import TokenOffsetChunker, supports_offsets
+from app.utils.micro_batching import MicroBatcher
+from app.utils.model_registry import get_tokenizer, get_embedding_engine
+from app.utils.pipeline import Pipeline
 from app.utils.logger import log_info, log_error, log_warning, log_performance
-from app.middleware.error_handler import FileProcessingException
+from app.middleware.error_handler import FileProcessingException, ProcessingCancelled
+
+_ingestion_stats = {"runs": 0, "seconds": 0.0, "last_bottleneck": None, "stages": {}}
+_ingestion_stats_lock = threading.Lock()
+
+# Questions asked at the same time share one forward pass
+query_embedder = MicroBatcher(
+    "query-embedding",
+    lambda questions: get_embedding_engine().embed(questions),
+    max_batch_size=QUERY_EMBED_MAX_BATCH,
+    max_wait_ms=QUERY_EMBED_WAIT_MS
+)
 
 
 
@@ -44,172 +71,57 @@ import numpy as np
 
 
 
-async def get_document(documents):
+CHUNK_SIZE = 1000      # Smaller, more manageable chunks
+CHUNK_OVERLAP = 200    # 20% overlap for context continuity
+CHUNK_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]  # Semantic boundaries
+
+_text_splitter = None
+
+
+def _get_text_splitter():
+    """
+    One splitter for the process. With a fast tokenizer, TokenOffsetChunker
+    tokenizes each page once and gives the same chunks as the recursive
+    splitter, which re-tokenizes every candidate piece.
+    """
+    global _text_splitter
+    if _text_splitter is None:
+        tokenizer = get_tokenizer()
+        if supports_offsets(tokenizer):
+            _text_splitter = TokenOffsetChunker(
+                tokenizer,
+                chunk_size=CHUNK_SIZE,
+                chunk_overlap=CHUNK_OVERLAP,
+                separators=CHUNK_SEPARATORS,
+                add_token_counts=True
+            )
+        else:
+            _text_splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+                tokenizer=tokenizer,
+                chunk_size=CHUNK_SIZE,
+                chunk_overlap=CHUNK_OVERLAP,
+                strip_whitespace=True,
+                separators=CHUNK_SEPARATORS
+            )
+    return _text_splitter
+
+
+def split_documents(documents):
+    """Split page Documents into token-sized chunks, each with its token_count"""
     start_time = time.time()
-    
-    # Improved chunking strategy
-    text_splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
-        tokenizer=tokenizer,
-        chunk_size=1000,      # Smaller, more manageable chunks
-        chunk_overlap=200,    # 20% overlap for context continuity
-        strip_whitespace=True,
-        separators=["\n\n", "\n", ". ", " ", ""]  # Semantic boundaries
-    )
+    text_splitter = _get_text_splitter()
     
     try:
         docs = text_splitter.split_documents(documents)
+        document_token_counts(docs)  # The recursive splitter does not record them
         total_content = sum(len(doc.page_content.strip()) for doc in docs)
-        print(docs, total_content)
         
-        # DEBUG: Check if content is empty and try OCR for PDFs
         if total_content == 0:
             log_warning(
-                "No text content extracted, attempting OCR for PDF documents",
+                "No text content in documents",
                 context="document_chunking",
                 num_documents=len(documents)
             )
-            
-            # Try OCR for PDF documents
-            try:
-                from app.services.ocr_service import ocr_service
-                import tempfile
-                import os
-               
-                # Get the source file path from the first document
-                if documents and hasattr(documents[0], 'metadata') and 'source' in documents[0].metadata:
-                    source_path = documents[0].metadata['source']
-                    
-                    # Check if it's a PDF file
-                    if source_path.lower().endswith('.pdf'):
-                        log_info(
-                            "PDF detected, attempting OCR processing",
-                            context="document_chunking",
-                            source_path=source_path
-                        )
-                        
-                        # Create temporary file for OCR processing
-                        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                            # Download file from MinIO - handle both /minio/ paths and relative paths
-                            try:
-                                from app.utils.minio import initialize_minio
-                                from app.config import MINIO_BUCKET_NAME
-                                
-                                minio_client = initialize_minio()
-                                
-                                # Determine bucket and object name
-                                if source_path.startswith('/minio/'):
-                                    # Full MinIO path
-                                    from app.utils.parse_minio_path import parse_minio_path
-                                    bucket_name, object_name = parse_minio_path(source_path)
-                                else:
-                                    # Relative path - use default bucket
-                                    bucket_name = MINIO_BUCKET_NAME
-                                    object_name = source_path.lstrip('/')  # Remove leading slash if present
-                                
-                                log_info(
-                                    f"Downloading file from MinIO for OCR",
-                                    context="document_chunking",
-                                    bucket_name=bucket_name,
-                                    object_name=object_name
-                                )
-                                
-                                # Download file to temporary location
-                                response = minio_client.get_object(bucket_name, object_name)
-                                temp_file.write(response.read())
-                                temp_file_path = temp_file.name
-                                
-                                log_info(
-                                    f"File downloaded successfully for OCR",
-                                    context="document_chunking",
-                                    temp_file_path=temp_file_path
-                                )
-                                
-                            except Exception as minio_error:
-                                log_error(
-                                    f"Failed to download file from MinIO: {minio_error}",
-                                    context="document_chunking",
-                                    source_path=source_path
-                                )
-                                # Try as local file path as fallback
-                                temp_file_path = source_path
-                        
-                        # Process with OCR
-                        ocr_pages = ocr_service.extract_text_from_pdf(temp_file_path)
-                        
-                        # Convert OCR results to LangChain Document objects
-                        ocr_documents = []
-                        for page_data in ocr_pages:
-                            if page_data["text"].strip():  # Only include pages with text
-                                doc = Document(
-                                    page_content=page_data["text"],
-                                    metadata={
-                                        "source": source_path,
-                                        "page": page_data["page"],
-                                        "extraction_method": "ocr",
-                                        "text_length": page_data["text_length"]
-                                    }
-                                )
-                                ocr_documents.append(doc)
-                        
-                        if ocr_documents:
-                            # Split OCR documents
-                            docs = text_splitter.split_documents(ocr_documents)
-                            total_content = sum(len(doc.page_content.strip()) for doc in docs)
-                            
-                            log_info(
-                                f"OCR processing successful",
-                                context="document_chunking",
-                                pages_processed=len(ocr_pages),
-                                documents_created=len(ocr_documents),
-                                chunks_created=len(docs),
-                                total_content=total_content
-                            )
-                        else:
-                            log_error(
-                                "OCR processing produced no text content",
-                                context="document_chunking",
-                                source_path=source_path,
-                                pages_processed=len(ocr_pages)
-                            )
-                        
-                        # Clean up temporary file
-                        if os.path.exists(temp_file_path) and temp_file_path != source_path:
-                            try:
-                                os.unlink(temp_file_path)
-                                log_info(
-                                    f"Temporary file cleaned up",
-                                    context="document_chunking",
-                                    temp_file_path=temp_file_path
-                                )
-                            except Exception as cleanup_error:
-                                log_warning(
-                                    f"Failed to clean up temporary file: {cleanup_error}",
-                                    context="document_chunking",
-                                    temp_file_path=temp_file_path
-                                )
-                            
-                    else:
-                        log_warning(
-                            "Non-PDF file with no content, OCR not applicable",
-                            context="document_chunking",
-                            source_path=source_path
-                        )
-                else:
-                    log_warning(
-                        "No source path available for OCR processing",
-                        context="document_chunking"
-                    )
-                    
-            except ImportError:
-                log_error(
-                    "OCR service not available - please install OCR dependencies",
-                    context="document_chunking"
-                )
-            except Exception as ocr_error:
-                log_error(
-                    f"OCR processing failed: {str(ocr_error)}",
-                    context="document_chunking"
-                )
         
         log_info(
             f"Document chunking completed",
@@ -224,7 +136,8 @@ async def get_document(documents):
             duration,
             num_documents=len(documents),
             num_chunks=len(docs),
-            avg_chunk_size=sum(len(doc.page_content) for doc in docs) / len(docs) if docs else 0
+            avg_chunk_size=sum(len(doc.page_content) for doc in docs) / len(docs) if docs else 0,
+            total_tokens=sum(doc.metadata["token_count"] for doc in docs)
         )
         
         return docs
@@ -244,6 +157,48 @@ async def get_document(documents):
 
 
 
+async def get_document(documents):
+    return split_documents(documents)
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    """Exact token counts (special tokens excluded) with one batched tokenizer call"""
+    if not texts:
+        return []
+    encoded = get_tokenizer()(
+        list(texts),
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        verbose=False
+    )
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def document_token_counts(docs: List[Document]) -> List[int]:
+    """
+    Token count of each Document. Chunks carry theirs in metadata (and in the
+    Qdrant payload); the rest, e.g. points indexed before counts were stored,
+    are tokenized together once and the count is recorded on the Document.
+    """
+    missing = [doc for doc in docs if not isinstance(doc.metadata.get("token_count"), int)]
+    for doc, count in zip(missing, count_tokens([doc.page_content for doc in missing])):
+        doc.metadata["token_count"] = count
+    return [doc.metadata["token_count"] for doc in docs]
+
+
+def pack_documents(docs: List[Document], max_tokens: int = LLM_CONTEXT_BUDGET) -> List[List[Document]]:
+    """Group Documents, in order, into as few groups of at most max_tokens as a single pass allows"""
+    groups, current, total = [], [], 0
+    for doc, count in zip(docs, document_token_counts(docs)):
+        if current and total + count > max_tokens:
+            groups.append(current)
+            current, total = [], 0
+        current.append(doc)
+        total += count
+    if current:
+        groups.append(current)
+    return groups
 
 
 
@@ -286,85 +241,232 @@ def create_qdrant_collection(collection_name: str, vector_dim: int):
             raise
 
 
-async def process_document_qdrant(documents, db_path):
+def _batched(iterable, size):
+    """Yield lists of up to `size` items from any iterable"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _QdrantIndexer:
+    """
+    Stage functions for the ingestion pipeline: chunk page windows, embed
+    chunk batches, upsert points. The collection is named after the source
+    file and created when the first batch is embedded.
+    """
+
+    def __init__(self, report):
+        self.report = report
+        self.collection_name = None
+        self.collection_ready = False
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.points_upserted = 0
+        self._lock = threading.Lock()
+
+    def chunk(self, window):
+        """Page window -> batches of (point id, chunk) ready for embedding"""
+        if self.collection_name is None:
+            source = window[0].metadata.get("source")
+            self.collection_name = source.split("/")[-1].split(".")[0] if source else "default_collection"
+
+        docs = split_documents(window)
+        first = self.chunks_total
+        self.pages_parsed += len(window)
+        self.chunks_total += len(docs)
+        self.report(pages_parsed=self.pages_parsed, chunks_total=self.chunks_total)
+
+        # Ids follow document order, and deterministic ids make a retried job
+        # overwrite its earlier points instead of duplicating them; the index
+        # is also kept in the payload so remove_stale_points can find the rest
+        items = []
+        for i, doc in enumerate(docs):
+            doc.metadata["chunk_index"] = first + i
+            items.append((str(uuid5(NAMESPACE_URL, f"{self.collection_name}:{first + i}")), doc))
+        return _batched(items, EMBEDDING_BATCH_SIZE)
+
+    def embed(self, batch):
+        docs = [doc for _, doc in batch]
+        # Repeated chunks (boilerplate pages, shared sections) come back from the cache
+        embeddings = embedding_cache.embed_documents(
+            [doc.page_content for doc in docs],
+            lambda missing: get_embedding_engine().embed(
+                [docs[i].page_content for i in missing],
+                lengths=[docs[i].metadata["token_count"] for i in missing]
+            )
+        )
+        if not self.collection_ready:
+            create_qdrant_collection(collection_name=self.collection_name, vector_dim=embeddings.shape[1])
+            self.collection_ready = True
+
+        with self._lock:
+            self.chunks_embedded += len(batch)
+            chunks_embedded = self.chunks_embedded
+        self.report(chunks_embedded=chunks_embedded)
+        return [(batch, embeddings)]
+
+    def upsert(self, embedded):
+        batch, embeddings = embedded
+        points = [
+            models.PointStruct(
+                id=point_id,
+                vector=vector.tolist(),
+                payload={"text": doc.page_content, "page": doc.metadata.get("page", 0), **doc.metadata}
+            )
+            for (point_id, doc), vector in zip(batch, embeddings)
+        ]
+        for i in range(0, len(points), QDRANT_UPSERT_BATCH_SIZE):
+            qdrant_client.upsert(
+                collection_name=self.collection_name,
+                points=points[i:i + QDRANT_UPSERT_BATCH_SIZE]
+            )
+
+        with self._lock:
+            self.points_upserted += len(points)
+            points_upserted = self.points_upserted
+        self.report(points_upserted=points_upserted)
+
+    def remove_stale_points(self):
+        """
+        Delete points an earlier run left behind: those past this run's last
+        chunk (the document now splits into fewer chunks) and those stored
+        without a chunk index, i.e. before ids were deterministic.
+        """
+        qdrant_client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    should=[
+                        models.FieldCondition(key="chunk_index", range=models.Range(gte=self.chunks_total)),
+                        models.IsEmptyCondition(is_empty=models.PayloadField(key="chunk_index"))
+                    ]
+                )
+            )
+        )
+
+
+def _record_ingestion(pipeline_stats):
+    with _ingestion_stats_lock:
+        _ingestion_stats["runs"] += 1
+        _ingestion_stats["seconds"] += pipeline_stats["seconds"]
+        _ingestion_stats["last_bottleneck"] = pipeline_stats["bottleneck"]
+        for name, stage in pipeline_stats["stages"].items():
+            totals = _ingestion_stats["stages"].setdefault(
+                name,
+                {"items": 0, "busy_seconds": 0.0, "starved_seconds": 0.0, "blocked_seconds": 0.0, "max_queue_depth": 0}
+            )
+            totals["items"] += stage["items_in"]
+            totals["busy_seconds"] += stage["busy_seconds"]
+            totals["starved_seconds"] += stage["starved_seconds"]
+            totals["blocked_seconds"] += stage["blocked_seconds"]
+            totals["max_queue_depth"] = max(totals["max_queue_depth"], stage["max_queue_depth"])
+
+
+def ingestion_stats():
+    """Per-stage totals across ingestion pipeline runs in this process"""
+    with _ingestion_stats_lock:
+        return {
+            "runs": _ingestion_stats["runs"],
+            "seconds": round(_ingestion_stats["seconds"], 3),
+            "last_bottleneck": _ingestion_stats["last_bottleneck"],
+            "queue_size": INGEST_QUEUE_SIZE,
+            "stages": {
+                name: {
+                    **totals,
+                    "busy_seconds": round(totals["busy_seconds"], 3),
+                    "starved_seconds": round(totals["starved_seconds"], 3),
+                    "blocked_seconds": round(totals["blocked_seconds"], 3),
+                    "items_per_busy_second": round(totals["items"] / totals["busy_seconds"], 2) if totals["busy_seconds"] else 0.0
+                }
+                for name, totals in _ingestion_stats["stages"].items()
+            }
+        }
+
+
+async def process_document_qdrant(documents, db_path, progress=None):
+    """
+    Chunk, embed and upsert documents into Qdrant.
+
+    `documents` may be a list or an iterator of page Documents such as
+    MinIOPyMuPDFLoader.lazy_load(), which already routes scanned pages through
+    OCR. Extraction, chunking, embedding and upserting run as concurrent
+    pipeline stages joined by queues of INGEST_QUEUE_SIZE batches: pages are
+    taken PDF_PAGE_WINDOW at a time, chunks embedded EMBEDDING_BATCH_SIZE at a
+    time, and a slow stage holds back the ones before it, so memory stays
+    bounded and the total time approaches that of the slowest stage.
+
+    `progress(stage=..., **counters)` receives pages_parsed, chunks_total,
+    chunks_embedded and points_upserted as the work moves along.
+    """
     start_time = time.time()
+    indexer = None
+
+    def report(stage=None, **counters):
+        if progress is None:
+            return
+        try:
+            progress(stage=stage, **counters)
+        except ProcessingCancelled:
+            # Raised in a stage thread, this stops the pipeline like any stage error
+            raise
+        except Exception as e:
+            log_warning(f"Progress callback failed: {e}", context="document_processing")
     
     try:
         log_info(
             "Starting document processing with Qdrant",
-            context="document_processing",
-            num_documents=len(documents)
+            context="document_processing"
         )
-        
-        # Step 1: Chunk the documents
-        docs = await get_document(documents)
 
-        # Step 2: Extract text from each document chunk
-        texts = [doc.page_content for doc in docs]
-
-        log_info(
-            f"Extracted {len(texts)} text chunks",
-            context="document_processing",
-            num_chunks=len(texts)
-        )
+        indexer = _QdrantIndexer(report)
+        report(stage="indexing")
+        pipeline = Pipeline("ingestion", _batched(documents, PDF_PAGE_WINDOW), queue_size=INGEST_QUEUE_SIZE)
+        pipeline.add_stage("chunking", indexer.chunk)
+        pipeline.add_stage("embedding", indexer.embed)
+        pipeline.add_stage("upserting", indexer.upsert, workers=INGEST_UPSERT_WORKERS)
+        # Stages run in their own threads; the event loop stays free meanwhile
+        pipeline_stats = await asyncio.to_thread(pipeline.run)
+        _record_ingestion(pipeline_stats)
+
+        if indexer.points_upserted == 0:
+            raise FileProcessingException(
+                "No text content could be extracted from the document",
+                {"num_documents": indexer.pages_parsed}
+            )
+        # Only once every point of this run is in, so a re-run never leaves
+        # the collection without the chunks it is replacing
+        await asyncio.to_thread(indexer.remove_stale_points)
 
-        # Step 3: Generate embeddings
-        embeddings = encoder.embed_documents(texts)
-        embeddings = np.array(embeddings)
         log_info(
-            f"Generated embeddings for {len(embeddings)} chunks",
+            f"Indexed {indexer.chunks_total} text chunks",
             context="document_processing",
-            embedding_dim=embeddings.shape[1]
+            num_chunks=indexer.chunks_total,
+            num_documents=indexer.pages_parsed
         )
-
-        # Step 4: Get or generate a collection name
-        file_name = "default_collection"
-        
-        # DEBUG: Check if docs has content before accessing metadata
-        debug_has_docs = True
-        
-
-        if docs and "source" in docs[0].metadata:
-            file_name = docs[0].metadata["source"].split("/")[-1].split(".")[0]
-
-        # Step 5: Create or validate collection in Qdrant
-        create_qdrant_collection(collection_name=file_name, vector_dim=embeddings.shape[1])
-
-        # Step 6: Upload documents and embeddings to Qdrant
-        payloads = []
-        for text, doc in zip(texts, docs):
-            metadata = doc.metadata.copy()
-            page_number = metadata.get("page", 0)
-            payload = {
-                "text": text,
-                "page": page_number,
-                **metadata
-            }
-            payloads.append(payload)
-            
-        points = [
-            models.PointStruct(
-                id=str(uuid4()),
-                vector=vector.tolist(),
-                payload=payload
-            )
-            for vector, payload in zip(embeddings, payloads)
-        ]
-
-        qdrant_client.upsert(
-            collection_name=file_name,
-            points=points
+        log_performance(
+            "Ingestion pipeline completed",
+            pipeline_stats["seconds"],
+            collection_name=indexer.collection_name,
+            bottleneck=pipeline_stats["bottleneck"],
+            sum_of_stage_seconds=pipeline_stats["sum_of_stage_seconds"],
+            stages=pipeline_stats["stages"]
         )
         
         duration = time.time() - start_time
         log_performance(
             "Document processing with Qdrant completed",
             duration,
-            collection_name=file_name,
-            points_inserted=len(points)
+            collection_name=indexer.collection_name,
+            points_inserted=indexer.points_upserted
         )
         
-        return {"collection": file_name, "points_inserted": len(points)}
+        return {"collection": indexer.collection_name, "points_inserted": indexer.points_upserted}
         
     except Exception as e:
         duration = time.time() - start_time
@@ -372,14 +474,19 @@ async def process_document_qdrant(documents, db_path):
             e,
             context="document_processing",
             duration=duration,
-            num_documents=len(documents)
+            num_documents=indexer.pages_parsed if indexer is not None else 0
         )
         raise e
 
 
 
 
-def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens=10000): 
+def embed_question(question: str) -> List[float]:
+    """A question's vector, from the embedding cache or batched with other concurrent questions"""
+    return embedding_cache.embed_query(question, lambda text: query_embedder.submit(text).result())
+
+
+def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens=LLM_CONTEXT_BUDGET, question_vector=None): 
     start_time = time.time()
     
     try:
@@ -392,15 +499,9 @@ def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens
             max_tokens=max_tokens
         )
         
-        qdrant_store = Qdrant(
-            client=qdrant_client,
-            collection_name=embedding_url,
-            embeddings=encoder,
-            content_payload_key="text"
-        )
-
-        # Step 1: Embed the question manually
-        question_vector = encoder.embed_query(question)
+        # Step 1: Embed the question manually (callers querying several collections pass it in)
+        if question_vector is None:
+            question_vector = embed_question(question)
 
         # Step 2: Search manually to access similarity scores
         results = qdrant_client.search(
@@ -435,44 +536,15 @@ def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens
                     offset=scroll_offset
                 )
 
-                batch = []
-                for doc in scroll_result:
-                    if hasattr(doc, "payload") and doc.payload and "text" in doc.payload:
-                        text = doc.payload.get("text", "")
-                        # Estimate tokens (roughly 4 characters per token)
-                        estimated_tokens = len(text) // 4
-                        
-                        if total_tokens + estimated_tokens > max_tokens:
-                            log_info(
-                                f"Token limit reached ({total_tokens}), stopping retrieval",
-                                context="document_retrieval",
-                                collection_name=embedding_url,
-                                total_tokens=total_tokens,
-                                max_tokens=max_tokens
-                            )
-                            break
-                        
-                        batch.append(Document(
-                            page_content=text,
-                            metadata=doc.payload or {}
-                        ))
-                        total_tokens += estimated_tokens
-                
-                retrieved_docs.extend(batch)
-
-                if scroll_offset is None or total_tokens >= max_tokens:
-                    break
-        else:
-            # Convert result to langchain.Document with token management
-            retrieved_docs = []
-            total_tokens = 0
-            
-            for doc in results:
-                if doc.payload.get("text", "").strip():
-                    text = doc.payload.get("text", "")
-                    estimated_tokens = len(text) // 4
-                    
-                    if total_tokens + estimated_tokens > max_tokens:
+                batch = [
+                    Document(page_content=doc.payload.get("text", ""), metadata=doc.payload)
+                    for doc in scroll_result
+                    if hasattr(doc, "payload") and doc.payload and "text" in doc.payload
+                ]
+                full = False
+                for document, tokens in zip(batch, document_token_counts(batch)):
+                    # Keep the opening of the document contiguous: stop at the first chunk that does not fit
+                    if total_tokens + tokens > max_tokens:
                         log_info(
                             f"Token limit reached ({total_tokens}), stopping retrieval",
                             context="document_retrieval",
@@ -480,13 +552,40 @@ def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens
                             total_tokens=total_tokens,
                             max_tokens=max_tokens
                         )
+                        full = True
                         break
-                    
-                    retrieved_docs.append(Document(
-                        page_content=text,
-                        metadata=doc.payload or {}
-                    ))
-                    total_tokens += estimated_tokens
+                    retrieved_docs.append(document)
+                    total_tokens += tokens
+
+                if full or scroll_offset is None:
+                    break
+        else:
+            # Pack by relevance: a chunk that does not fit is skipped so smaller,
+            # less relevant ones can still use the remaining budget
+            candidates = [
+                Document(page_content=doc.payload["text"], metadata=doc.payload)
+                for doc in results
+                if doc.payload.get("text", "").strip()
+            ]
+            retrieved_docs = []
+            total_tokens = 0
+            skipped = 0
+            
+            for document, tokens in zip(candidates, document_token_counts(candidates)):
+                if total_tokens + tokens > max_tokens:
+                    skipped += 1
+                    continue
+                retrieved_docs.append(document)
+                total_tokens += tokens
+            
+            if skipped:
+                log_info(
+                    f"Token limit reached ({total_tokens}), skipped {skipped} chunks",
+                    context="document_retrieval",
+                    collection_name=embedding_url,
+                    total_tokens=total_tokens,
+                    max_tokens=max_tokens
+                )
             
             log_info(
                 f"Retrieved {len(retrieved_docs)} documents with similarity search",
@@ -520,8 +619,7 @@ def retrieved_docs(question, embedding_url, similarity_threshold=0.2, max_tokens
         key=lambda doc: int(doc.metadata.get("page", 0)) if str(doc.metadata.get("page", "0")).isdigit() else 0
     )
     
-    # Calculate final token count
-    total_tokens = sum(len(doc.page_content) // 4 for doc in retrieved_docs)
+    total_tokens = sum(doc.metadata["token_count"] for doc in retrieved_docs)
     
     duration = time.time() - start_time
     log_performance(
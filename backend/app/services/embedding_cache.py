@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import (
+    MODEL_NAME,
+    CACHE_TTL_EMBEDDINGS,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_REDIS,
+)
+from app.utils.redis_client import get_redis, mark_redis_failed
+
+REDIS_KEY_PREFIX = "emb:"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Unicode NFC with runs of whitespace collapsed: the model's tokenizer
+    splits on whitespace anyway, so texts that differ only there embed the same.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embedding vectors, keyed by the model name and a hash
+    of the normalised text.
+
+    The local tier is an in-process LRU of raw float32 bytes, evicted once it
+    outgrows `max_bytes`. The Redis tier is shared between processes and hosts,
+    stores the same bytes with a CACHE_TTL_EMBEDDINGS expiry, and is skipped
+    while Redis is unreachable; hits there are copied to memory.
+    """
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        use_redis: bool = EMBEDDING_CACHE_REDIS,
+        enabled: bool = EMBEDDING_CACHE_ENABLED,
+    ):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.use_redis = use_redis
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def embed_documents(self, texts: Sequence[str], compute: Callable[[List[int]], np.ndarray]) -> np.ndarray:
+        """
+        Vectors for texts as a float32 matrix, row i for texts[i]. Only texts
+        missing from both tiers are embedded, each distinct one once:
+        compute(indices) must return their vectors as rows, in that order.
+        """
+        if not self.enabled or not texts:
+            return np.asarray(compute(list(range(len(texts)))), dtype=np.float32)
+
+        keys = [self.key(text) for text in texts]
+        found = self._get_many(keys)
+
+        first_index: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if found[key] is None:
+                first_index.setdefault(key, i)
+        if first_index:
+            missing = list(first_index.values())
+            computed = np.asarray(compute(missing), dtype=np.float32)
+            for i, vector in zip(missing, computed):
+                found[keys[i]] = vector
+            self._set_many({keys[i]: vector for i, vector in zip(missing, computed)})
+
+        dimension = len(next(iter(found.values())))
+        output = np.empty((len(texts), dimension), dtype=np.float32)
+        for i, key in enumerate(keys):
+            output[i] = found[key]
+        return output
+
+    def embed_query(self, text: str, compute: Callable[[str], Sequence[float]]) -> List[float]:
+        """The vector for one text, from the cache or compute(text)"""
+        return self.embed_documents([text], lambda _: [compute(text)])[0].tolist()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Optional[np.ndarray]]:
+        found: Dict[str, Optional[np.ndarray]] = {}
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                data = self._entries.get(key)
+                if data is not None:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                found[key] = data
+
+        remote = [key for key, data in found.items() if data is None]
+        for key, data in zip(remote, self._redis_get_many(remote)):
+            if data is not None:
+                found[key] = data
+                self._remember(key, data)
+        with self._lock:
+            self._stats["redis_hits"] += sum(1 for key in remote if found[key] is not None)
+            self._stats["misses"] += sum(1 for key in remote if found[key] is None)
+
+        return {key: None if data is None else np.frombuffer(data, dtype=np.float32) for key, data in found.items()}
+
+    def _set_many(self, vectors: Dict[str, np.ndarray]):
+        entries = {key: np.ascontiguousarray(vector, dtype=np.float32).tobytes() for key, vector in vectors.items()}
+        for key, data in entries.items():
+            self._remember(key, data)
+        self._redis_set_many(entries)
+        with self._lock:
+            self._stats["writes"] += len(entries)
+
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(key) + len(previous)
+            self._entries[key] = data
+            self._size += len(key) + len(data)
+            while self._size > self.max_bytes and self._entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted_key) + len(evicted)
+                self._stats["evictions"] += 1
+
+    def _redis_get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        client = get_redis() if self.use_redis and keys else None
+        if client is None:
+            return [None] * len(keys)
+        try:
+            return client.mget([REDIS_KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            mark_redis_failed(e)
+            return [None] * len(keys)
+
+    def _redis_set_many(self, entries: Dict[str, bytes]):
+        client = get_redis() if self.use_redis and entries else None
+        if client is None:
+            return
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for key, data in entries.items():
+                pipeline.set(REDIS_KEY_PREFIX + key, data, ex=CACHE_TTL_EMBEDDINGS)
+            pipeline.execute()
+        except Exception as e:
+            mark_redis_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["redis_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round((lookups - self._stats["misses"]) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "memory_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "redis_enabled": self.use_redis,
+                "enabled": self.enabled
+            }
+
+
+# Create global embedding cache instance
+embedding_cache = EmbeddingCache()
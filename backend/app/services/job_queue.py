@@ -0,0 +1,270 @@
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import or_, and_, func
+
+from app.config import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF_SECONDS
+from app.db.database import SessionLocal
+from app.db.models import ProcessingJobRecord
+from app.utils.logger import log_info, log_error, log_warning
+
+
+class PostgresJobQueue:
+    """
+    Durable processing queue stored in Postgres.
+
+    Workers lease jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+    worker nodes can poll concurrently without handing out the same job twice.
+    A lease has to be renewed by heartbeats; once it expires the job becomes
+    claimable again and is retried until max_attempts is reached.
+    All timestamps come from the database clock to avoid skew between nodes.
+    """
+
+    def __init__(self, session_factory, lease_seconds: int, max_attempts: int, retry_backoff_seconds: int):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    def submit(self, file_id: int, user_id: int) -> Dict[str, Any]:
+        """Enqueue a file, returning the already active job for that file if any"""
+        db = self.session_factory()
+        try:
+            active = db.query(ProcessingJobRecord).filter(
+                ProcessingJobRecord.file_id == file_id,
+                ProcessingJobRecord.status.in_(("queued", "running"))
+            ).first()
+            if active:
+                return self._to_dict(active)
+
+            job = ProcessingJobRecord(
+                id=str(uuid4()),
+                file_id=file_id,
+                user_id=user_id,
+                status="queued",
+                progress={},
+                attempts=0,
+                max_attempts=self.max_attempts,
+                version=0
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            log_info(
+                "Processing job enqueued",
+                context="job_queue",
+                job_id=job.id,
+                file_id=file_id,
+                user_id=user_id
+            )
+            return self._to_dict(job)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            job = db.query(ProcessingJobRecord).filter(ProcessingJobRecord.id == job_id).first()
+            return self._to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job (queued, or running with an expired lease)"""
+        db = self.session_factory()
+        try:
+            while True:
+                job = db.query(ProcessingJobRecord).filter(
+                    or_(
+                        and_(
+                            ProcessingJobRecord.status == "queued",
+                            ProcessingJobRecord.available_at <= func.now()
+                        ),
+                        and_(
+                            ProcessingJobRecord.status == "running",
+                            ProcessingJobRecord.lease_expires_at < func.now()
+                        )
+                    )
+                ).order_by(
+                    ProcessingJobRecord.created_at
+                ).with_for_update(skip_locked=True).limit(1).first()
+
+                if job is None:
+                    db.commit()
+                    return None
+
+                if job.status == "running":
+                    log_warning(
+                        "Lease expired, reclaiming job",
+                        context="job_queue",
+                        job_id=job.id,
+                        previous_owner=job.lease_owner,
+                        attempts=job.attempts
+                    )
+                    if job.attempts >= job.max_attempts:
+                        job.status = "failed"
+                        job.stage = "failed"
+                        job.error = job.error or "Worker lease expired too many times"
+                        job.lease_owner = None
+                        job.finished_at = func.now()
+                        job.version += 1
+                        db.commit()
+                        continue
+
+                job.status = "running"
+                job.lease_owner = worker_id
+                job.lease_expires_at = func.now() + timedelta(seconds=self.lease_seconds)
+                job.heartbeat_at = func.now()
+                job.started_at = func.now()
+                job.attempts += 1
+                job.version += 1
+                db.commit()
+                db.refresh(job)
+
+                log_info(
+                    "Processing job claimed",
+                    context="job_queue",
+                    job_id=job.id,
+                    worker_id=worker_id,
+                    attempt=job.attempts
+                )
+                return self._to_dict(job)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def heartbeat(self, job_id: str, worker_id: str, stage: str = None, progress: Dict[str, Any] = None) -> bool:
+        """Extend the lease and persist progress; returns False if the lease was lost"""
+        values = {
+            ProcessingJobRecord.lease_expires_at: func.now() + timedelta(seconds=self.lease_seconds),
+            ProcessingJobRecord.heartbeat_at: func.now(),
+        }
+        if stage is not None:
+            values[ProcessingJobRecord.stage] = stage
+        if progress is not None:
+            values[ProcessingJobRecord.progress] = progress
+            values[ProcessingJobRecord.version] = ProcessingJobRecord.version + 1
+        return self._update_owned(job_id, worker_id, values)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._update_owned(job_id, worker_id, {
+            ProcessingJobRecord.status: "succeeded",
+            ProcessingJobRecord.stage: "completed",
+            ProcessingJobRecord.result: result,
+            ProcessingJobRecord.error: None,
+            ProcessingJobRecord.lease_owner: None,
+            ProcessingJobRecord.finished_at: func.now(),
+            ProcessingJobRecord.version: ProcessingJobRecord.version + 1,
+        })
+
+    def fail(self, job_id: str, worker_id: str, error: str, retryable: bool = True) -> bool:
+        """Record a failure, re-queueing the job with a backoff while attempts remain"""
+        db = self.session_factory()
+        try:
+            job = db.query(ProcessingJobRecord).filter(
+                ProcessingJobRecord.id == job_id,
+                ProcessingJobRecord.lease_owner == worker_id,
+                ProcessingJobRecord.status == "running"
+            ).with_for_update().first()
+            if job is None:
+                db.commit()
+                return False
+
+            job.error = error
+            job.lease_owner = None
+            job.lease_expires_at = None
+            job.version += 1
+            if retryable and job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.stage = "retrying"
+                job.available_at = func.now() + timedelta(seconds=self.retry_backoff_seconds * job.attempts)
+            else:
+                job.status = "failed"
+                job.stage = "failed"
+                job.finished_at = func.now()
+            db.commit()
+
+            log_warning(
+                f"Processing job failed: {error}",
+                context="job_queue",
+                job_id=job_id,
+                worker_id=worker_id,
+                attempts=job.attempts,
+                status=job.status
+            )
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                ProcessingJobRecord.status, func.count(ProcessingJobRecord.id)
+            ).group_by(ProcessingJobRecord.status).all()
+            return {"backend": "postgres", "jobs": {status: count for status, count in rows}}
+        except Exception as e:
+            log_error(e, context="job_queue_stats")
+            return {"backend": "postgres", "error": str(e)}
+        finally:
+            db.close()
+
+    def _update_owned(self, job_id: str, worker_id: str, values: Dict) -> bool:
+        db = self.session_factory()
+        try:
+            updated = db.query(ProcessingJobRecord).filter(
+                ProcessingJobRecord.id == job_id,
+                ProcessingJobRecord.lease_owner == worker_id,
+                ProcessingJobRecord.status == "running"
+            ).update(values, synchronize_session=False)
+            db.commit()
+            return updated == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(job: ProcessingJobRecord) -> Dict[str, Any]:
+        def ts(value):
+            return value.timestamp() if value else None
+
+        elapsed = 0.0
+        if job.started_at:
+            end = job.finished_at or job.heartbeat_at or job.started_at
+            elapsed = (end - job.started_at).total_seconds()
+
+        return {
+            "job_id": job.id,
+            "file_id": job.file_id,
+            "user_id": job.user_id,
+            "status": job.status,
+            "stage": job.stage,
+            "progress": job.progress or {},
+            "result": job.result,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": ts(job.created_at),
+            "started_at": ts(job.started_at),
+            "finished_at": ts(job.finished_at),
+            "elapsed": elapsed,
+            "version": job.version
+        }
+
+
+job_queue = PostgresJobQueue(
+    SessionLocal,
+    lease_seconds=JOB_LEASE_SECONDS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=JOB_RETRY_BACKOFF_SECONDS
+)
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from app.config import PROCESSING_WORKERS, PROCESSING_MAX_PENDING_JOBS, JOB_RETENTION_SECONDS, JOB_QUEUE_BACKEND
+from app.db.database import SessionLocal
+from app.middleware.error_handler import CustomHTTPException
+from app.utils.logger import log_info, log_error, log_warning, log_performance
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    TERMINAL = (SUCCEEDED, FAILED)
+
+
+class ProcessingJob:
+    """In-memory state of a document processing job, safe to update from worker threads"""
+
+    def __init__(self, file_id: int, user_id: int):
+        self.id = str(uuid4())
+        self.file_id = file_id
+        self.user_id = user_id
+        self.status = JobStatus.QUEUED
+        self.stage = None
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Bumped on every change so streams can tell whether there is news
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def update_progress(self, stage: str = None, **counters):
+        with self._lock:
+            if stage:
+                self.stage = stage
+            self.progress.update(counters)
+            self.version += 1
+
+    def mark_running(self):
+        with self._lock:
+            self.status = JobStatus.RUNNING
+            self.started_at = time.time()
+            self.version += 1
+
+    def mark_finished(self, result: Dict[str, Any] = None, error: str = None):
+        with self._lock:
+            self.status = JobStatus.FAILED if error else JobStatus.SUCCEEDED
+            self.stage = "failed" if error else "completed"
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.version += 1
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in JobStatus.TERMINAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "file_id": self.file_id,
+                "user_id": self.user_id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": (end - self.started_at) if self.started_at else 0.0,
+                "version": self.version
+            }
+
+
+class JobManager:
+    """
+    Bounded in-process worker pool for document processing.
+
+    Each job runs the async ingestion pipeline on its own event loop inside a
+    worker thread, so the API event loop keeps serving requests while large
+    documents are parsed and embedded.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retention_seconds: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-job")
+        self._jobs: Dict[str, ProcessingJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, file_id: int, user_id: int) -> Dict[str, Any]:
+        """Queue a file for processing, returning the already active job for that file if any"""
+        with self._lock:
+            self._prune()
+            for job in self._jobs.values():
+                if job.file_id == file_id and not job.is_finished:
+                    return job.to_dict()
+
+            pending = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if pending >= self.max_pending:
+                log_warning(
+                    "Processing queue is full",
+                    context="job_manager",
+                    pending=pending,
+                    max_pending=self.max_pending
+                )
+                raise CustomHTTPException(
+                    status_code=429,
+                    detail="Too many documents are being processed, please retry later",
+                    error_code="JOB_QUEUE_FULL",
+                    context={"pending": pending}
+                )
+
+            job = ProcessingJob(file_id, user_id)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job)
+        log_info(
+            "Processing job queued",
+            context="job_manager",
+            job_id=job.id,
+            file_id=file_id,
+            user_id=user_id
+        )
+        return job.to_dict()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.max_workers, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window (caller holds the lock)"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.is_finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: ProcessingJob):
+        # Imported here to avoid a circular import with the processing pipeline
+        from app.services.processing_service import process_uploaded_file
+
+        job.mark_running()
+        db = SessionLocal()
+        try:
+            result = asyncio.run(process_uploaded_file(
+                job.file_id,
+                job.user_id,
+                db,
+                request_id=job.id,
+                progress=job.update_progress
+            ))
+            job.mark_finished(result=result)
+            log_performance(
+                "Processing job completed",
+                job.finished_at - job.started_at,
+                job_id=job.id,
+                file_id=job.file_id
+            )
+        except CustomHTTPException as e:
+            job.mark_finished(error=e.detail)
+        except Exception as e:
+            log_error(e, context="job_manager", job_id=job.id, file_id=job.file_id)
+            job.mark_finished(error=str(e))
+        finally:
+            db.close()
+
+
+job_manager = JobManager(
+    max_workers=PROCESSING_WORKERS,
+    max_pending=PROCESSING_MAX_PENDING_JOBS,
+    retention_seconds=JOB_RETENTION_SECONDS
+)
+
+
+def get_job_backend():
+    """
+    Return the job backend selected by JOB_QUEUE_BACKEND: the in-process pool
+    ("local") or the Postgres queue drained by standalone workers ("postgres").
+    Both expose submit(file_id, user_id) and get_job(job_id) returning dicts.
+    """
+    if JOB_QUEUE_BACKEND == "postgres":
+        from app.services.job_queue import job_queue
+        return job_queue
+    return job_manager
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES, OCR_CACHE_REDIS, CACHE_TTL_OCR
+from app.utils.redis_client import get_redis, mark_redis_failed
+from app.utils.logger import log_info, log_warning
+
+REDIS_KEY_PREFIX = "ocr:"
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class OCRCache:
+    """
+    Two-tier cache of OCR page results, keyed by the source PDF's content hash,
+    the page number and the OCR settings that shape the output.
+
+    The local tier is a directory of small JSON files evicted least recently
+    used once it outgrows `max_bytes` (file mtimes record last use). The Redis
+    tier is optional and shared between hosts; hits there are copied to disk.
+    """
+
+    def __init__(self, directory: str = OCR_CACHE_DIR, max_bytes: int = OCR_CACHE_MAX_BYTES, use_redis: bool = OCR_CACHE_REDIS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.use_redis = use_redis
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self.directory.glob("*/*.json"))
+        self._stats = {"disk_hits": 0, "redis_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(pdf_hash: str, page: int, settings: str) -> str:
+        return hashlib.sha256(f"{pdf_hash}:{page}:{settings}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # Touch on read so eviction follows last use, not creation
+            os.utime(path)
+            self._count("disk_hits")
+            return json.loads(data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log_warning(f"Unreadable OCR cache entry {key}: {e}", context="ocr_cache")
+
+        data = self._redis_get(key)
+        if data is not None:
+            self._count("redis_hits")
+            self._write_disk(key, data)
+            return json.loads(data)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, result: Dict[str, Any]):
+        data = json.dumps(result).encode()
+        self._write_disk(key, data)
+        self._redis_set(key, data)
+        self._count("writes")
+
+    def _write_disk(self, key: str, data: bytes):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            # Write then rename, so concurrent readers never see a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log_warning(f"Failed to write OCR cache entry {key}: {e}", context="ocr_cache")
+            return
+
+        with self._lock:
+            self._size += len(data) - previous
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of its budget"""
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                except FileNotFoundError:
+                    continue
+            # Re-sync with disk: other processes may share the directory
+            self._size = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if self._size <= target:
+                    break
+                try:
+                    path.unlink()
+                    self._size -= size
+                    evicted += 1
+                except FileNotFoundError:
+                    continue
+            self._stats["evictions"] += evicted
+        if evicted:
+            log_info("Evicted OCR cache entries", context="ocr_cache", evicted=evicted, size=self._size)
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        client = get_redis() if self.use_redis else None
+        if client is None:
+            return None
+        try:
+            return client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            mark_redis_failed(e)
+            return None
+
+    def _redis_set(self, key: str, data: bytes):
+        client = get_redis() if self.use_redis else None
+        if client is None:
+            return
+        try:
+            client.set(REDIS_KEY_PREFIX + key, data, ex=CACHE_TTL_OCR)
+        except Exception as e:
+            mark_redis_failed(e)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["disk_hits"] + self._stats["redis_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round((lookups - self._stats["misses"]) / lookups, 3) if lookups else 0.0,
+                "disk_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "redis_enabled": self.use_redis
+            }
+
+
+# Create global OCR cache instance
+ocr_cache = OCRCache()
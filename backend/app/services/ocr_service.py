@@ -1,25 +1,71 @@
+import json
+import multiprocessing
 import os
-import tempfile
+import threading
+import time
 import cv2
 import numpy as np
+import psutil
 from PIL import Image
-import easyocr
 import pytesseract
-from pdf2image import convert_from_path
-import pypdf
-from typing import List, Dict, Any
-from app.utils.logger import log_info, log_error, log_warning
+from pdf2image import convert_from_path, pdfinfo_from_path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from app.utils.logger import log_info, log_error, log_warning, log_performance
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Pages are first probed at PROBE_DPI; blank ones are skipped, pages whose text is large enough are OCR'd from
+# the probe itself, and only the rest are rendered again, as finely as their text needs
+MIN_DPI = int(os.getenv("OCR_MIN_DPI", "150"))
+PROBE_DPI = int(os.getenv("OCR_PROBE_DPI", str(MIN_DPI)))  # At MIN_DPI by default, so the probe is a valid final render
+MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+TARGET_LINE_PX = int(os.getenv("OCR_TARGET_LINE_PX", "40"))  # Text line height the engines read best, in pixels
+BLANK_INK_RATIO = float(os.getenv("OCR_BLANK_INK_RATIO", "0.002"))  # Pages with less dark ink than this are blank
+RASTER_WINDOW = int(os.getenv("OCR_RASTER_WINDOW", "4"))  # Pages rasterized per conversion in the serial path
+# Engines are tried in this order; a page stops at the first one whose mean word confidence (0-100) clears the threshold
+ENGINE_ORDER = [name.strip() for name in os.getenv("OCR_ENGINE_ORDER", "tesseract,easyocr").split(",") if name.strip()]
+CONFIDENCE_THRESHOLD = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "70"))
+TESSERACT_LANG = os.getenv("OCR_TESSERACT_LANG", "eng+fra")
 
 
 class OCRService:
     def __init__(self):
         self.reader = None
-        self._initialize_ocr()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._engines = {
+            "tesseract": self._read_tesseract,
+            "easyocr": self._read_easyocr
+        }
+        self._stats_lock = threading.Lock()
+        self._engine_stats = {}
+        self._pages_read = 0
+        self._pages_blank = 0
+        self._dpi_total = 0
+        self._cache = None
+    
+    def _ensure_initialized(self):
+        """
+        Load EasyOCR on first use. Importing the service stays cheap, so API
+        processes that never OCR a page never pay for the models; warm_up()
+        does the same loading ahead of time.
+        """
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize_ocr()
+                self._initialized = True
     
     def _initialize_ocr(self):
         """Initialize OCR engines"""
         try:
-            # Try to initialize EasyOCR first (more accurate)
+            # Imported here: easyocr pulls in torch, which alone costs hundreds of MB
+            import easyocr
             # Use compatible language combinations
             self.reader = easyocr.Reader(['en', 'fr'])  # Remove Arabic for compatibility
             log_info("EasyOCR initialized successfully", context="ocr_service")
@@ -27,137 +73,487 @@ class OCRService:
             log_warning(f"EasyOCR initialization failed: {e}, falling back to Tesseract", context="ocr_service")
             self.reader = None
     
-    def is_image_based_pdf(self, pdf_path: str) -> bool:
-        """Check if PDF is image-based (scanned)"""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text.strip():  # If any page has text, it's not fully image-based
-                        return False
-                
-                return True  # No text found, likely image-based
-        except Exception as e:
-            log_error(f"Error checking PDF type: {e}", context="ocr_service")
-            return True  # Assume image-based if check fails
-    
-    def extract_text_from_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Extract text from PDF using OCR"""
+    def warm_up(self) -> Dict[str, Any]:
+        """Load the engines in ENGINE_ORDER now rather than on the first scanned page"""
+        start_time = time.time()
+        if "easyocr" in ENGINE_ORDER:
+            self._ensure_initialized()
+        if "tesseract" in ENGINE_ORDER:
+            try:
+                pytesseract.get_tesseract_version()
+            except Exception as e:
+                log_warning(f"Tesseract not available: {e}", context="ocr_service")
+        return {
+            "pid": os.getpid(),
+            "seconds": round(time.time() - start_time, 3),
+            "rss_mb": round(psutil.Process().memory_info().rss / 1024 / 1024, 1),
+            "easyocr": self.reader is not None
+        }
+
+    def extract_text_from_pdf(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]] = None,
+        workers: int = 1,
+        use_cache: bool = True,
+        doc_hash: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract text from PDF using OCR, limited to the given 1-based page numbers if provided.
+
+        With workers > 1, pages are OCR'd in a shared process pool: each task
+        rasterizes and reads a single page, and only a bounded number of pages
+        are in flight at once. Every page goes to the pool, even when there is
+        only one, so the OCR engines are never loaded in the calling process.
+        Results are returned in page order.
+
+        Page results are cached by PDF content hash, page number and OCR
+        settings, so re-processing the same document only OCRs new pages.
+        Callers OCR'ing one document in several calls pass its document_hash()
+        as `doc_hash`, so the file is hashed once rather than on every call.
+        """
+        start_time = time.time()
         try:
-            log_info(f"Starting OCR extraction from PDF: {pdf_path}", context="ocr_service")
+            if pages is None:
+                pages = list(range(1, pdfinfo_from_path(pdf_path)["Pages"] + 1))
+            pages = sorted(set(pages))
+            parallel = workers > 1
+
+            log_info(
+                f"Starting OCR extraction from PDF: {pdf_path}",
+                context="ocr_service",
+                pages=len(pages),
+                workers=workers if parallel else 1
+            )
+            
+            cache = self._get_cache() if use_cache else None
+            cache_keys = {}
+            cached = []
+            if cache is not None:
+                pdf_hash = doc_hash or cache.hash_file(pdf_path)
+                settings = _settings_fingerprint()
+                for page_number in pages:
+                    cache_keys[page_number] = cache.key(pdf_hash, page_number, settings)
+                    hit = cache.get(cache_keys[page_number])
+                    if hit is not None:
+                        cached.append(hit)
+                cached_pages = {result["page"] for result in cached}
+                pages_to_ocr = [page_number for page_number in pages if page_number not in cached_pages]
+            else:
+                pages_to_ocr = pages
+            # With nothing left to OCR, don't start the pool just to skip it
+            parallel = parallel and bool(pages_to_ocr)
+
+            page_results = self._ocr_parallel(pdf_path, pages_to_ocr, workers) if parallel else self._ocr_serial(pdf_path, pages_to_ocr)
+            results = [result for result in cached if result["text"]]
+            for result in page_results:
+                if result is None:
+                    continue
+                # Pool workers keep their own counters, so attempts travel back with each page
+                self._record_page(result.pop("attempts"), result["dpi"])
+                if cache is not None:
+                    cache.set(cache_keys[result["page"]], result)
+                if result["text"]:
+                    results.append(result)
+            results.sort(key=lambda result: result["page"])
             
-            # Convert PDF to images
-            images = convert_from_path(pdf_path, dpi=300)
-            log_info(f"Converted PDF to {len(images)} images", context="ocr_service")
+            duration = time.time() - start_time
+            log_performance(
+                "OCR extraction completed",
+                duration,
+                total_pages=len(pages),
+                pages_cached=len(cached),
+                pages_with_text=len(results),
+                workers=workers if parallel else 1,
+                pages_per_second=len(pages) / duration if duration > 0 else None,
+                engines=self.stats()["engines"]
+            )
             
-            results = []
-            for page_num, image in enumerate(images):
+            return results
+            
+        except Exception as e:
+            log_error(f"OCR extraction failed: {e}", context="ocr_service")
+            return []
+
+    def _ocr_serial(self, pdf_path: str, pages: List[int]) -> Iterator[Optional[Dict[str, Any]]]:
+        for page_number, probe in self._iter_page_images(pdf_path, pages, PROBE_DPI):
+            try:
+                yield self._ocr_probed(pdf_path, page_number, probe)
+            finally:
+                probe.close()
+
+    def _ocr_parallel(self, pdf_path: str, pages: List[int], workers: int) -> Iterator[Optional[Dict[str, Any]]]:
+        pool = get_ocr_pool(workers)
+        # Bound the pages in flight: each one is a rasterized image in some worker
+        max_in_flight = workers * 2
+        pending = deque()
+        next_page = 0
+        try:
+            while next_page < len(pages) or pending:
+                while next_page < len(pages) and len(pending) < max_in_flight:
+                    pending.append((pages[next_page], pool.submit(_ocr_pdf_page, pdf_path, pages[next_page])))
+                    next_page += 1
+                page_number, future = pending.popleft()
                 try:
-                    # Convert PIL image to OpenCV format
-                    opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                    
-                    # Preprocess image for better OCR
-                    processed_image = self._preprocess_image(opencv_image)
-                    
-                    # Extract text using OCR
-                    text = self._extract_text_from_image(processed_image)
-                    
-                    if text.strip():
-                        results.append({
-                            "page": page_num + 1,
-                            "text": text,
-                            "extraction_method": "ocr",
-                            "text_length": len(text)
-                        })
-                        
-                        log_info(
-                            f"Extracted text from page {page_num + 1}",
-                            context="ocr_service",
-                            page=page_num + 1,
-                            text_length=len(text)
-                        )
-                    else:
-                        log_warning(
-                            f"No text extracted from page {page_num + 1}",
-                            context="ocr_service",
-                            page=page_num + 1
-                        )
-                        
+                    yield future.result()
+                except BrokenProcessPool:
+                    # A worker died (usually out of memory); drop the pool so the next call starts fresh
+                    shutdown_ocr_pool()
+                    raise
                 except Exception as page_error:
                     log_error(
-                        f"Error processing page {page_num + 1}: {page_error}",
+                        f"Error processing page {page_number}: {page_error}",
                         context="ocr_service",
-                        page=page_num + 1
+                        page=page_number
                     )
+                    yield None
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def ocr_page(self, pdf_path: str, page_number: int) -> Optional[Dict[str, Any]]:
+        """Rasterize and OCR a single page"""
+        probe = _render_page(pdf_path, page_number, PROBE_DPI)
+        try:
+            return self._ocr_probed(pdf_path, page_number, probe)
+        finally:
+            probe.close()
+
+    def _ocr_probed(self, pdf_path: str, page_number: int, probe: Image.Image) -> Optional[Dict[str, Any]]:
+        """OCR a page given its probe: skip it if blank, otherwise reuse the probe or re-render at the DPI its text size calls for"""
+        try:
+            dpi = self._choose_dpi(np.asarray(probe.convert("L") if probe.mode != "L" else probe))
+        except Exception as e:
+            log_warning(f"Page analysis failed: {e}, rendering at {MAX_DPI} DPI", context="ocr_service", page=page_number)
+            dpi = MAX_DPI
+
+        if dpi is None:
+            log_info(f"Skipping blank page {page_number}", context="ocr_service", page=page_number)
+            return {
+                "page": page_number,
+                "text": "",
+                "extraction_method": "ocr",
+                "text_length": 0,
+                "engine": None,
+                "confidence": None,
+                "dpi": None,
+                "attempts": []
+            }
+
+        if dpi <= PROBE_DPI:
+            # The probe is already at least as fine as the text needs
+            return self._ocr_image(page_number, probe, PROBE_DPI)
+        image = _render_page(pdf_path, page_number, dpi)
+        try:
+            return self._ocr_image(page_number, image, dpi)
+        finally:
+            image.close()
+
+    def _choose_dpi(self, gray: np.ndarray) -> Optional[int]:
+        """
+        Pick a render DPI from cheap statistics of the probe image: None for a
+        near-blank page, otherwise the DPI that brings the median text line
+        height to about TARGET_LINE_PX, clamped to [MIN_DPI, MAX_DPI].
+        """
+        # Ignore the outer margins, where scanner edges and punch holes show up as ink
+        h, w = gray.shape
+        body = gray[h // 20:h - h // 20, w // 20:w - w // 20]
+        if body.size == 0:
+            return None
+
+        # Ink is anything clearly darker than the paper, whatever the scan's background level
+        ink = body < np.median(body) * 0.6
+        if ink.mean() < BLANK_INK_RATIO:
+            return None
+
+        # Text lines show up as runs of rows containing ink; their median height estimates the glyph size
+        inked_rows = np.concatenate(([False], ink.mean(axis=1) > 0.01, [False]))
+        edges = np.flatnonzero(np.diff(inked_rows.astype(np.int8)))
+        heights = edges[1::2] - edges[0::2]
+        heights = heights[heights >= 2]
+        if heights.size == 0:
+            return MAX_DPI
+
+        dpi = PROBE_DPI * TARGET_LINE_PX / float(np.median(heights))
+        return int(min(MAX_DPI, max(MIN_DPI, round(dpi / 25) * 25)))
+
+    def _ocr_image(self, page_number: int, image: Image.Image, dpi: int) -> Optional[Dict[str, Any]]:
+        """OCR one rasterized page; the result's text is empty when nothing was found, None on error"""
+        try:
+            # Pages are rasterized in grayscale, which OpenCV takes as-is
+            if image.mode != "L":
+                image = image.convert("L")
             
-            log_info(
-                f"OCR extraction completed",
-                context="ocr_service",
-                total_pages=len(images),
-                pages_with_text=len(results)
-            )
+            # Preprocess image for better OCR
+            processed_image = self._preprocess_image(np.asarray(image))
             
-            return results
+            # Extract text using OCR
+            text, engine, confidence, attempts = self._extract_text_from_image(processed_image)
             
-        except Exception as e:
-            log_error(f"OCR extraction failed: {e}", context="ocr_service")
-            return []
+            if text:
+                log_info(
+                    f"Extracted text from page {page_number}",
+                    context="ocr_service",
+                    page=page_number,
+                    text_length=len(text),
+                    engine=engine,
+                    confidence=confidence
+                )
+            else:
+                log_warning(
+                    f"No text extracted from page {page_number}",
+                    context="ocr_service",
+                    page=page_number
+                )
+            return {
+                "page": page_number,
+                "text": text,
+                "extraction_method": "ocr",
+                "text_length": len(text),
+                "engine": engine,
+                "confidence": confidence,
+                "dpi": dpi,
+                "attempts": attempts
+            }
+            
+        except Exception as page_error:
+            log_error(
+                f"Error processing page {page_number}: {page_error}",
+                context="ocr_service",
+                page=page_number
+            )
+            return None
+
+    def _iter_page_images(self, pdf_path: str, pages: List[int], dpi: int) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        Rasterize the requested pages in grayscale, at most RASTER_WINDOW pages
+        per conversion, so only one small window of images is alive at a time
+        whatever the page count.
+        """
+        for run in _consecutive_runs(pages):
+            for start in range(0, len(run), RASTER_WINDOW):
+                window = run[start:start + RASTER_WINDOW]
+                images = convert_from_path(
+                    pdf_path,
+                    dpi=dpi,
+                    first_page=window[0],
+                    last_page=window[-1],
+                    grayscale=True
+                )
+                # Hand images over one by one and drop our reference, so each is freed once OCR'd
+                images.reverse()
+                for page_number in window:
+                    if not images:
+                        break
+                    yield page_number, images.pop()
     
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """Preprocess image for better OCR results"""
         try:
             # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
             # Apply thresholding to get binary image
             _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             
-            # Apply morphological operations to clean up
-            kernel = np.ones((1, 1), np.uint8)
-            cleaned = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-            
-            return cleaned
+            return binary
             
         except Exception as e:
             log_warning(f"Image preprocessing failed: {e}, using original image", context="ocr_service")
             return image
     
-    def _extract_text_from_image(self, image: np.ndarray) -> str:
-        """Extract text from image using available OCR engines"""
-        text_results = []
-        
-        # Try EasyOCR first
-        if self.reader:
+    def _extract_text_from_image(self, image: np.ndarray) -> Tuple[str, Optional[str], Optional[float], List[Dict[str, Any]]]:
+        """
+        Run the OCR engines as a cascade, cheapest first: a page is accepted from
+        the first engine whose mean confidence reaches CONFIDENCE_THRESHOLD, and
+        only low-confidence pages escalate to the next engine. If none clears it,
+        the most confident result wins.
+
+        Returns (text, engine, confidence, attempts), where attempts lists each
+        engine run with its timing for the stats.
+        """
+        attempts = []
+        best = ("", None, None)
+        for name in ENGINE_ORDER:
+            read = self._engines.get(name)
+            if read is None:
+                continue
+            start_time = time.perf_counter()
             try:
-                results = self.reader.readtext(image)
-                text = ' '.join([result[1] for result in results])
-                if text.strip():
-                    text_results.append(text)
-                    log_info("EasyOCR extraction successful", context="ocr_service")
+                text, confidence = read(image)
             except Exception as e:
-                log_warning(f"EasyOCR failed: {e}", context="ocr_service")
-        
-        # Try Tesseract as fallback
-        try:
-            # Try English first, then French
-            tesseract_text = pytesseract.image_to_string(image, lang='eng')
-            if not tesseract_text.strip():
-                tesseract_text = pytesseract.image_to_string(image, lang='fra')
-            
-            if tesseract_text.strip():
-                text_results.append(tesseract_text)
-                log_info("Tesseract extraction successful", context="ocr_service")
-        except Exception as e:
-            log_warning(f"Tesseract failed: {e}", context="ocr_service")
-        
-        # Return the best result (longest text)
-        if text_results:
-            best_text = max(text_results, key=len)
-            return best_text.strip()
+                log_warning(f"{name} failed: {e}", context="ocr_service")
+                attempts.append({"engine": name, "seconds": time.perf_counter() - start_time, "accepted": False, "failed": True})
+                continue
+            text = text.strip()
+            accepted = bool(text) and confidence >= CONFIDENCE_THRESHOLD
+            attempts.append({"engine": name, "seconds": time.perf_counter() - start_time, "accepted": accepted, "failed": False})
+            if text and (best[2] is None or confidence > best[2]):
+                best = (text, name, confidence)
+            if accepted:
+                break
+        return best[0], best[1], best[2], attempts
+
+    def _read_tesseract(self, image: np.ndarray) -> Tuple[str, float]:
+        """Tesseract text with its mean word confidence; one pass covers all TESSERACT_LANG languages"""
+        data = pytesseract.image_to_data(image, lang=TESSERACT_LANG, output_type=pytesseract.Output.DICT)
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if not word.strip() or confidence < 0:
+                continue
+            confidences.append(confidence)
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(word)
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+    def _read_easyocr(self, image: np.ndarray) -> Tuple[str, float]:
+        """EasyOCR text with its mean detection confidence, scaled to 0-100"""
+        self._ensure_initialized()
+        if self.reader is None:
+            raise RuntimeError("EasyOCR is not available")
+        results = self.reader.readtext(image)
+        text = " ".join(result[1] for result in results)
+        return text, (sum(result[2] for result in results) / len(results) * 100 if results else 0.0)
+
+    def document_hash(self, pdf_path: str) -> Optional[str]:
+        """Content hash keying the cached pages of a PDF, or None when the cache is unavailable"""
+        cache = self._get_cache()
+        return cache.hash_file(pdf_path) if cache is not None else None
+
+    def _get_cache(self):
+        """The OCR cache, imported on first use"""
+        if self._cache is None:
+            module = _cache_module()
+            if module is not None:
+                self._cache = module.ocr_cache
+        return self._cache
+
+    def _record_page(self, attempts: List[Dict[str, Any]], dpi: Optional[int]):
+        with self._stats_lock:
+            self._pages_read += 1
+            if dpi is None:
+                self._pages_blank += 1
+            else:
+                self._dpi_total += dpi
+            for attempt in attempts:
+                stats = self._engine_stats.setdefault(
+                    attempt["engine"],
+                    {"runs": 0, "accepted": 0, "failed": 0, "seconds": 0.0}
+                )
+                stats["runs"] += 1
+                stats["accepted"] += int(attempt["accepted"])
+                stats["failed"] += int(attempt["failed"])
+                stats["seconds"] += attempt["seconds"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-engine run counts, acceptance rates and timings, for tuning the cascade"""
+        with self._stats_lock:
+            engines = {}
+            for name, stats in self._engine_stats.items():
+                engines[name] = {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "avg_seconds": round(stats["seconds"] / stats["runs"], 3) if stats["runs"] else 0.0,
+                    "acceptance_rate": round(stats["accepted"] / stats["runs"], 3) if stats["runs"] else 0.0
+                }
+            rendered = self._pages_read - self._pages_blank
+            return {
+                "pages": self._pages_read,
+                "pages_blank": self._pages_blank,
+                "avg_dpi": round(self._dpi_total / rendered) if rendered else None,
+                "engine_order": ENGINE_ORDER,
+                "confidence_threshold": CONFIDENCE_THRESHOLD,
+                "engines": engines,
+                "cache": self._cache.stats() if self._cache is not None else None
+            }
+
+
+def _consecutive_runs(pages: List[int]) -> List[List[int]]:
+    """Group sorted page numbers into runs of consecutive pages, e.g. [1, 2, 5] -> [[1, 2], [5]]"""
+    runs = []
+    for page in pages:
+        if runs and page == runs[-1][-1] + 1:
+            runs[-1].append(page)
         else:
-            return ""
+            runs.append([page])
+    return runs
+
+
+def get_ocr_pool(max_workers: int) -> ProcessPoolExecutor:
+    """OCR process pool shared by all callers in this process, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: OCR engines run their own threads, which don't survive a fork
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_ocr_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _settings_fingerprint() -> str:
+    """Every setting that can change a page's OCR output; part of the cache key"""
+    return json.dumps([
+        ENGINE_ORDER, CONFIDENCE_THRESHOLD, TESSERACT_LANG,
+        PROBE_DPI, MIN_DPI, MAX_DPI, TARGET_LINE_PX, BLANK_INK_RATIO
+    ])
+
+
+def _cache_module():
+    """app.services.ocr_cache, or None when caching is disabled"""
+    from app.config import OCR_CACHE_ENABLED
+    if not OCR_CACHE_ENABLED:
+        return None
+    from app.services import ocr_cache
+    return ocr_cache
+
+
+def warm_up_ocr(workers: int = 1) -> List[Dict[str, Any]]:
+    """
+    Warm-up hook: load the OCR engines before the first scanned page arrives.
+
+    With workers > 1 this starts the OCR pool and loads the engines in each
+    worker process, leaving the calling process untouched; otherwise the
+    engines are loaded in-process. Returns each process's load time and RSS.
+    """
+    start_time = time.time()
+    if workers > 1:
+        pool = get_ocr_pool(workers)
+        # While a worker is busy loading, the next task makes the pool start another process
+        reports = [future.result() for future in [pool.submit(_warm_up_worker) for _ in range(workers)]]
+    else:
+        reports = [ocr_service.warm_up()]
+    log_performance(
+        "OCR engines warmed up",
+        time.time() - start_time,
+        workers=workers,
+        processes=len({report["pid"] for report in reports}),
+        load_seconds=max(report["seconds"] for report in reports),
+        rss_mb=[report["rss_mb"] for report in reports]
+    )
+    return reports
+
+
+def _warm_up_worker() -> Dict[str, Any]:
+    return ocr_service.warm_up()
+
+
+def _render_page(pdf_path: str, page_number: int, dpi: int) -> Image.Image:
+    return convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, grayscale=True)[0]
+
+
+def _ocr_pdf_page(pdf_path: str, page_number: int) -> Optional[Dict[str, Any]]:
+    """Pool task: each worker process OCRs with its own service instance, initialised on its first page"""
+    return ocr_service.ocr_page(pdf_path, page_number)
 
 
 # Create global OCR service instance
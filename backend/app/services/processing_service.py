@@ -0,0 +1,339 @@
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from minio.error import S3Error
+from sqlalchemy.orm import Session
+
+from app.config import ALLOWED_EXTENSIONS, LLM_CONTEXT_BUDGET, qdrant_client
+from app.db.models import UploadedFile, Chat
+from app.services.document_service import process_document_qdrant, retrieved_docs
+from app.services.chat_service import generate_summary, generate_questions
+from app.services.tabular_service import build_table_store
+from app.utils.minio import initialize_minio
+from app.utils.document_loaders import get_loader
+from app.utils.parse_minio_path import parse_minio_path
+from app.utils.spreadsheet_extraction import SPREADSHEET_EXTENSIONS
+from app.middleware.error_handler import FileProcessingException, ValidationException, DatabaseException, ProcessingCancelled
+from app.utils.logger import log_info, log_error, log_warning, log_performance
+
+minio_client = initialize_minio()
+
+ProgressCallback = Callable[..., None]
+
+
+def _report(progress: Optional[ProgressCallback], stage: str = None, **counters):
+    """Forward a progress update to the caller; only ProcessingCancelled from it stops processing"""
+    if progress is None:
+        return
+    try:
+        progress(stage=stage, **counters)
+    except ProcessingCancelled:
+        raise
+    except Exception as e:
+        log_warning(f"Progress callback failed: {e}", context="document_process")
+
+
+async def process_uploaded_file(
+    file_id: int,
+    user_id: int,
+    db: Session,
+    request_id: str = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Run the full ingestion pipeline for an uploaded file: download from MinIO,
+    parse, chunk, embed, upsert into Qdrant, then generate summary and questions.
+
+    `progress` is called as progress(stage=..., **counters) whenever a stage
+    starts or a counter (pages_parsed, chunks_embedded, points_upserted...) moves.
+    """
+    start_time = time.time()
+
+    log_info(
+        "Document processing started",
+        context="document_process",
+        request_id=request_id,
+        file_id=file_id,
+        user_id=user_id
+    )
+
+    uploaded_file = db.query(UploadedFile).filter(UploadedFile.id == file_id).first()
+    if not uploaded_file:
+        log_warning(
+            "File not found for processing",
+            context="document_process",
+            request_id=request_id,
+            file_id=file_id,
+            user_id=user_id
+        )
+        raise ValidationException("File not found", {"file_id": file_id})
+
+    if uploaded_file.file_type.lower() not in ALLOWED_EXTENSIONS:
+        log_warning(
+            "Unsupported file type for processing",
+            context="document_process",
+            request_id=request_id,
+            file_id=file_id,
+            file_type=uploaded_file.file_type
+        )
+        raise ValidationException("Unsupported file type", {"file_type": uploaded_file.file_type})
+
+    if not uploaded_file.file_path or not uploaded_file.file_path.startswith('/minio/'):
+        log_warning(
+            "Invalid file path format",
+            context="document_process",
+            request_id=request_id,
+            file_id=file_id,
+            file_path=uploaded_file.file_path
+        )
+        raise ValidationException("Invalid file path format", {"file_path": uploaded_file.file_path})
+
+    # Identical content already processed for another upload: reuse its collection and results
+    source = _find_processed_duplicate(db, uploaded_file)
+    if source is not None:
+        return _process_by_reference(uploaded_file, source, user_id, db, start_time, request_id, progress)
+
+    bucket_name, object_name = parse_minio_path(uploaded_file.file_path)
+
+    # Verify object exists in MinIO before downloading
+    _report(progress, stage="downloading")
+    try:
+        minio_client.stat_object(bucket_name, object_name)
+        log_info(
+            "File found in MinIO storage",
+            context="document_process",
+            request_id=request_id,
+            bucket_name=bucket_name,
+            object_name=object_name
+        )
+    except S3Error as e:
+        log_error(
+            e,
+            context="minio_storage",
+            request_id=request_id,
+            bucket_name=bucket_name,
+            object_name=object_name
+        )
+        raise FileProcessingException(f"File not found in storage: {str(e)}", {"bucket": bucket_name, "object": object_name})
+
+    # Stream pages from the loader straight into chunking/embedding
+    _report(progress, stage="parsing")
+    try:
+        loader = get_loader(minio_client, bucket_name, object_name, uploaded_file.file_type)
+        result = await process_document_qdrant(
+            loader.lazy_load(),
+            db_path=None,
+            progress=progress
+        )
+        uploaded_file.embedding_path = result["collection"]
+        db.commit()
+        log_info(
+            "Document processed with Qdrant successfully",
+            context="document_process",
+            request_id=request_id,
+            collection=result["collection"],
+            points_inserted=result["points_inserted"]
+        )
+    except (FileProcessingException, ProcessingCancelled):
+        raise
+    except Exception as e:
+        log_error(
+            e,
+            context="qdrant_processing",
+            request_id=request_id,
+            file_id=file_id
+        )
+        raise FileProcessingException(f"Failed to process document: {str(e)}", {"file_id": file_id})
+
+    # Spreadsheets are also stored as Parquet so aggregate questions can be computed locally
+    if uploaded_file.file_type.lower() in SPREADSHEET_EXTENSIONS:
+        _report(progress, stage="tabulating")
+        try:
+            build_table_store(bucket_name, object_name)
+        except Exception as e:
+            # Not fatal: without tables, questions go through retrieval as for any document
+            log_error(
+                e,
+                context="tabular_store",
+                request_id=request_id,
+                file_id=file_id
+            )
+
+    # Generate summary and questions
+    _report(progress, stage="summarizing")
+    try:
+        short_name = uploaded_file.file_name.split('.')[0][:15]
+        # Use token-limited retrieval to avoid hitting Groq limits
+        context = retrieved_docs("give me please summary for the document", uploaded_file.embedding_path, max_tokens=LLM_CONTEXT_BUDGET)
+
+        # Check if context is a string (error message) or list of documents
+        if isinstance(context, str):
+            log_warning(
+                f"Document retrieval returned error: {context}",
+                context="document_process",
+                request_id=request_id,
+                file_id=file_id
+            )
+            summary = f"Unable to generate summary: {context}"
+            questions = [f"Unable to generate questions: {context}"]
+        else:
+            summary = await generate_summary(short_name, context)
+            questions = await generate_questions(short_name, context)
+
+        log_info(
+            "Summary and questions generated",
+            context="document_process",
+            request_id=request_id,
+            summary_length=len(summary),
+            questions_count=len(questions) if isinstance(questions, list) else 0
+        )
+
+    except Exception as e:
+        log_error(
+            e,
+            context="ai_generation",
+            request_id=request_id,
+            file_id=file_id
+        )
+        raise FileProcessingException(f"Failed to generate response: {str(e)}", {"file_id": file_id})
+
+    # Save to database
+    _report(progress, stage="saving")
+    try:
+        db.add(Chat(
+            response=summary,
+            user_id=user_id,
+            uploaded_file_id=file_id,
+            created_at_response=datetime.now()
+        ))
+
+        db.add(Chat(
+            response=json.dumps(questions),
+            user_id=user_id,
+            uploaded_file_id=file_id,
+            created_at_response=datetime.now()
+        ))
+
+        db.commit()
+        log_info(
+            "Chat records saved to database",
+            context="document_process",
+            request_id=request_id,
+            user_id=user_id,
+            file_id=file_id
+        )
+    except Exception as e:
+        db.rollback()
+        log_error(
+            e,
+            context="database_save",
+            request_id=request_id,
+            user_id=user_id,
+            file_id=file_id
+        )
+        raise DatabaseException("Failed to save chat records", {"user_id": user_id, "file_id": file_id})
+
+    duration = time.time() - start_time
+    log_performance(
+        "Document processing completed",
+        duration,
+        request_id=request_id,
+        file_id=file_id,
+        user_id=user_id
+    )
+
+    return {
+        "summary": summary,
+        "questions": questions,
+        "collection": result["collection"],
+        "points_inserted": result["points_inserted"],
+        "duration": duration
+    }
+
+
+def _find_processed_duplicate(db: Session, uploaded_file: UploadedFile) -> Optional[UploadedFile]:
+    """Another upload of the same bytes whose collection still exists and whose summary was generated"""
+    if not uploaded_file.content_hash:
+        return None
+    candidates = db.query(UploadedFile).filter(
+        UploadedFile.content_hash == uploaded_file.content_hash,
+        UploadedFile.id != uploaded_file.id,
+        UploadedFile.embedding_path.isnot(None)
+    ).order_by(UploadedFile.id.desc()).all()
+    for candidate in candidates:
+        if len(_generated_chats(db, candidate.id)) < 2:
+            continue
+        try:
+            if qdrant_client.collection_exists(candidate.embedding_path):
+                return candidate
+        except Exception as e:
+            log_warning(f"Could not check Qdrant collection: {e}", context="document_process")
+            return None
+    return None
+
+
+def _generated_chats(db: Session, file_id: int):
+    """The summary and questions saved by processing: the file's first two chats without a question"""
+    return db.query(Chat).filter(
+        Chat.uploaded_file_id == file_id,
+        Chat.question.is_(None)
+    ).order_by(Chat.id).limit(2).all()
+
+
+def _process_by_reference(
+    uploaded_file: UploadedFile,
+    source: UploadedFile,
+    user_id: int,
+    db: Session,
+    start_time: float,
+    request_id: str = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    _report(progress, stage="saving")
+    summary_chat, questions_chat = _generated_chats(db, source.id)
+    try:
+        uploaded_file.embedding_path = source.embedding_path
+        for chat in (summary_chat, questions_chat):
+            db.add(Chat(
+                response=chat.response,
+                user_id=user_id,
+                uploaded_file_id=uploaded_file.id,
+                created_at_response=datetime.now()
+            ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        log_error(
+            e,
+            context="database_save",
+            request_id=request_id,
+            user_id=user_id,
+            file_id=uploaded_file.id
+        )
+        raise DatabaseException("Failed to save chat records", {"user_id": user_id, "file_id": uploaded_file.id})
+
+    duration = time.time() - start_time
+    log_performance(
+        "Document processed by reference",
+        duration,
+        request_id=request_id,
+        file_id=uploaded_file.id,
+        source_file_id=source.id,
+        collection=source.embedding_path
+    )
+
+    try:
+        questions = json.loads(questions_chat.response)
+    except (TypeError, ValueError):
+        questions = questions_chat.response
+
+    return {
+        "summary": summary_chat.response,
+        "questions": questions,
+        "collection": source.embedding_path,
+        "points_inserted": 0,
+        "deduplicated": True,
+        "duration": duration
+    }
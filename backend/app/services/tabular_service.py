@@ -0,0 +1,229 @@
+import io
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from langchain.schema import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from minio.error import S3Error
+
+from app.config import llm, TABULAR_QUERY_ENABLED, TABULAR_MAX_RESULT_ROWS, TABULAR_CACHE_TABLES
+from app.utils.minio import initialize_minio
+from app.utils.minio_spool import MinIOSpooledLoader
+from app.utils.parse_minio_path import parse_minio_path
+from app.utils.prompt import custom_table_query_prompt_template
+from app.utils.spreadsheet_extraction import SPREADSHEET_EXTENSIONS
+from app.utils.table_query import PlanError, describe_frame, execute_plan, format_table, iter_sheet_frames
+from app.utils.logger import log_info, log_error, log_warning, log_performance
+
+minio_client = initialize_minio()
+
+TABLES_SUFFIX = ".tables"
+MANIFEST_NAME = "manifest.json"
+
+# Questions worth a planning call; anything else goes straight to retrieval
+AGGREGATE_PATTERN = re.compile(
+    r"\b(total|sum|average|mean|median|count|how many|how much|number of|maximum|minimum|max|min|"
+    r"highest|lowest|largest|smallest|top \d+|for each|group(?:ed)? by|distinct|"
+    r"somme|moyenne|m[ée]diane|combien|nombre de|plus (?:grand|petit|[ée]lev[ée])|pour chaque)\b",
+    re.IGNORECASE
+)
+
+_stats = {"questions": 0, "answered": 0, "declined": 0, "failed": 0, "seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+def tables_prefix(object_name: str) -> str:
+    """Parquet tables live next to their source object: <object>.tables/"""
+    return f"{object_name}{TABLES_SUFFIX}/"
+
+
+def build_table_store(bucket_name: str, object_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Store each sheet of a CSV/XLSX object as Parquet, plus a manifest of
+    sheet names, row counts, column types and sample rows. Objects are
+    content-addressed, so an existing manifest means the work is done.
+    """
+    extension = os.path.splitext(object_name)[1].lstrip(".").lower()
+    if extension not in SPREADSHEET_EXTENSIONS:
+        return None
+
+    existing = load_manifest(bucket_name, object_name)
+    if existing is not None:
+        return existing
+
+    start_time = time.time()
+    prefix = tables_prefix(object_name)
+    sheets = []
+    with MinIOSpooledLoader(minio_client, bucket_name, object_name).spool() as path:
+        for title, index, frame in iter_sheet_frames(path, extension):
+            buffer = io.BytesIO()
+            frame.to_parquet(buffer, index=False)
+            size = buffer.tell()
+            buffer.seek(0)
+            table_object = f"{prefix}sheet-{index}.parquet"
+            minio_client.put_object(bucket_name, table_object, buffer, size, content_type="application/vnd.apache.parquet")
+            sheets.append({"name": title, "index": index, "object": table_object, "bytes": size, **describe_frame(frame)})
+
+    manifest = {"source": object_name, "sheets": sheets}
+    data = json.dumps(manifest).encode()
+    # Written last: a manifest means every sheet it lists is in place
+    minio_client.put_object(bucket_name, prefix + MANIFEST_NAME, io.BytesIO(data), len(data), content_type="application/json")
+
+    log_performance(
+        "Spreadsheet tables stored",
+        time.time() - start_time,
+        object_name=object_name,
+        sheets=len(sheets),
+        rows=sum(sheet["rows"] for sheet in sheets),
+        parquet_bytes=sum(sheet["bytes"] for sheet in sheets)
+    )
+    return manifest
+
+
+def remove_table_store(bucket_name: str, object_name: str):
+    """Delete the Parquet tables stored for an object, if any"""
+    for item in minio_client.list_objects(bucket_name, prefix=tables_prefix(object_name), recursive=True):
+        minio_client.remove_object(bucket_name, item.object_name)
+
+
+def load_manifest(bucket_name: str, object_name: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = minio_client.get_object(bucket_name, tables_prefix(object_name) + MANIFEST_NAME)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            return None
+        raise
+    try:
+        return json.loads(response.read())
+    finally:
+        response.close()
+        response.release_conn()
+
+
+@lru_cache(maxsize=TABULAR_CACHE_TABLES)
+def _load_frame(bucket_name: str, table_object: str) -> pd.DataFrame:
+    response = minio_client.get_object(bucket_name, table_object)
+    try:
+        return pd.read_parquet(io.BytesIO(response.read()))
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def answer_from_tables(question: str, file_path: str) -> Optional[List[Document]]:
+    """
+    Answer an aggregate question about a spreadsheet by running it locally.
+
+    The LLM sees only the table schema and turns the question into a JSON
+    plan; pandas executes it over every row and the result table (at most
+    TABULAR_MAX_RESULT_ROWS rows) comes back as the single context Document.
+    Returns None whenever the question should go through normal retrieval
+    instead: not a spreadsheet, no stored tables, not an aggregate question,
+    or a plan that does not fit the table.
+    """
+    extension = os.path.splitext(file_path or "")[1].lstrip(".").lower()
+    if not TABULAR_QUERY_ENABLED or llm is None or extension not in SPREADSHEET_EXTENSIONS:
+        return None
+    if not AGGREGATE_PATTERN.search(question):
+        return None
+    bucket_name, object_name = parse_minio_path(file_path)
+
+    start_time = time.time()
+    _count("questions")
+    try:
+        manifest = load_manifest(bucket_name, object_name)
+        if manifest is None or not manifest["sheets"]:
+            _count("declined")
+            return None
+
+        plan = _plan_query(question, manifest)
+        if plan is None or plan.get("tabular") is False:
+            log_info("Question not answerable from tables", context="tabular_query", object_name=object_name)
+            _count("declined")
+            return None
+
+        sheets = {sheet["name"]: sheet for sheet in manifest["sheets"]}
+        # A plan may leave out the sheet of a one-sheet workbook, but never runs against a sheet it did not name
+        if plan.get("sheet") is None and len(sheets) == 1:
+            sheet = manifest["sheets"][0]
+        elif plan.get("sheet") in sheets:
+            sheet = sheets[plan["sheet"]]
+        else:
+            raise PlanError(f"Unknown sheet {plan.get('sheet')!r}, expected one of {', '.join(map(repr, sheets))}")
+        frame = _load_frame(bucket_name, sheet["object"])
+        result, total = execute_plan(frame, plan, TABULAR_MAX_RESULT_ROWS)
+        table = format_table(result, total)
+    except PlanError as e:
+        log_warning(f"Query plan rejected: {e}", context="tabular_query", object_name=object_name)
+        _count("declined")
+        return None
+    except Exception as e:
+        log_error(e, context="tabular_query", object_name=object_name)
+        _count("failed")
+        return None
+
+    duration = time.time() - start_time
+    _count("answered", duration)
+    log_performance(
+        "Tabular question answered",
+        duration,
+        object_name=object_name,
+        sheet=sheet["name"],
+        rows_scanned=sheet["rows"],
+        result_rows=len(result),
+        context_chars=len(table)
+    )
+    content = (
+        f"Sheet: {sheet['name']} ({sheet['rows']} rows)\n"
+        f"Computed over every row with this query: {json.dumps(plan, ensure_ascii=False)}\n"
+        f"Result:\n{table}"
+    )
+    return [Document(
+        page_content=content,
+        metadata={"source": object_name, "page": 1, "sheet": sheet["name"], "extraction_method": "table_query"}
+    )]
+
+
+def _plan_query(question: str, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    schema = "\n".join(
+        f"- {sheet['name']} ({sheet['rows']} rows): "
+        + ", ".join(f"{column['name']} ({column['dtype']})" for column in sheet["columns"])
+        + "".join(f"\n    sample: {' | '.join(row)}" for row in sheet["sample"])
+        for sheet in manifest["sheets"]
+    )
+    chain = ChatPromptTemplate.from_template(custom_table_query_prompt_template()) | llm | StrOutputParser()
+    result = chain.invoke({"schema": schema, "question": question})
+
+    result = re.sub(r"<(think|thinking|thought|reasoning)>.*?</\1>", "", result, flags=re.DOTALL | re.IGNORECASE)
+    start, end = result.find("{"), result.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        plan = json.loads(result[start:end + 1])
+    except ValueError:
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+def _count(outcome: str, duration: float = 0.0):
+    with _stats_lock:
+        _stats[outcome] += 1
+        _stats["seconds"] += duration
+
+
+def tabular_stats() -> Dict[str, Any]:
+    """How often questions were answered from tables rather than retrieval"""
+    with _stats_lock:
+        return {
+            **_stats,
+            "seconds": round(_stats["seconds"], 3),
+            "avg_seconds": round(_stats["seconds"] / _stats["answered"], 3) if _stats["answered"] else 0.0,
+            "cached_tables": _load_frame.cache_info().currsize
+        }
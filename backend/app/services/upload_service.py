@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import UploadFile, status
+from minio.error import S3Error
+from sqlalchemy.orm import Session
+
+from app.config import MINIO_BUCKET_NAME, MAX_FILE_SIZE_MB, UPLOAD_CHUNK_SIZE, UPLOAD_PART_SIZE, CONVERSION_WORKERS
+from app.db.models import UploadedFile
+from app.utils.converters import CONVERSIONS, convert_file
+from app.utils.minio import initialize_minio
+from app.middleware.error_handler import CustomHTTPException
+from app.utils.logger import log_info, log_performance
+
+minio_client = initialize_minio()
+
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+CONTENT_PREFIX = "content"
+
+_conversion_pool: Optional[ProcessPoolExecutor] = None
+_conversion_pool_lock = threading.Lock()
+# Uploads wait here, on the event loop, rather than piling up in the pool's queue
+_conversion_slots = asyncio.Semaphore(CONVERSION_WORKERS)
+_conversion_stats: Dict[str, Dict[str, Any]] = {}
+_conversion_stats_lock = threading.Lock()
+
+
+class FileTooLargeException(CustomHTTPException):
+    def __init__(self, size: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE_MB}MB",
+            error_code="FILE_TOO_LARGE",
+            context={"size": size}
+        )
+
+
+class SpooledUpload:
+    """An upload copied to a temporary file, with its size and SHA-256 computed on the way"""
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self._temp_paths: List[str] = [path]
+
+    def track(self, path: str) -> str:
+        """Register a derived temporary file (e.g. a conversion output) for cleanup"""
+        self._temp_paths.append(path)
+        return path
+
+    def cleanup(self):
+        for path in self._temp_paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int = MAX_FILE_SIZE_BYTES) -> SpooledUpload:
+    """
+    Copy an upload to a temporary file UPLOAD_CHUNK_SIZE bytes at a time,
+    hashing as it goes and rejecting it as soon as it passes `max_bytes`, so
+    memory per upload stays constant whatever the file size.
+    """
+    start_time = time.time()
+    suffix = os.path.splitext(upload.filename or "")[1]
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeException(size)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    log_performance(
+        "Upload spooled",
+        time.time() - start_time,
+        file_name=upload.filename,
+        size=size
+    )
+    return SpooledUpload(path, size, digest.hexdigest())
+
+
+async def convert_upload(spooled: SpooledUpload, extension: str) -> Tuple[str, str]:
+    """
+    Convert formats we store differently: images become PDF, legacy .xls
+    becomes CSV. Returns the path and extension of the file to store.
+
+    Conversions run in a process pool, at most CONVERSION_WORKERS at a time,
+    so a large spreadsheet doesn't block the event loop for other requests.
+    """
+    if extension not in CONVERSIONS:
+        return spooled.path, extension
+
+    target_extension, _ = CONVERSIONS[extension]
+    out_path = spooled.track(_temp_path(f".{target_extension}"))
+    async with _conversion_slots:
+        start_time = time.time()
+        try:
+            future = get_conversion_pool().submit(convert_file, spooled.path, out_path, extension)
+            output_size = await asyncio.wrap_future(future)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A converter crashed its worker; start a fresh pool for the next upload
+                shutdown_conversion_pool()
+            _record_conversion(extension, time.time() - start_time, spooled.size, failed=True)
+            raise
+        duration = time.time() - start_time
+
+    _record_conversion(extension, duration, spooled.size)
+    log_performance(
+        "Upload converted",
+        duration,
+        source_format=extension,
+        target_format=target_extension,
+        input_size=spooled.size,
+        output_size=output_size
+    )
+    return out_path, target_extension
+
+
+def get_conversion_pool() -> ProcessPoolExecutor:
+    global _conversion_pool
+    with _conversion_pool_lock:
+        if _conversion_pool is None:
+            # Spawned workers import only app.utils.converters, not the API process's models
+            _conversion_pool = ProcessPoolExecutor(
+                max_workers=CONVERSION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _conversion_pool
+
+
+def shutdown_conversion_pool():
+    global _conversion_pool
+    with _conversion_pool_lock:
+        if _conversion_pool is not None:
+            _conversion_pool.shutdown(wait=False, cancel_futures=True)
+            _conversion_pool = None
+
+
+def _record_conversion(extension: str, duration: float, input_size: int, failed: bool = False):
+    with _conversion_stats_lock:
+        stats = _conversion_stats.setdefault(
+            extension,
+            {"count": 0, "failures": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0}
+        )
+        stats["count"] += 1
+        stats["failures"] += int(failed)
+        stats["seconds"] += duration
+        stats["max_seconds"] = max(stats["max_seconds"], duration)
+        stats["bytes"] += input_size
+
+
+def conversion_stats() -> Dict[str, Any]:
+    """Per-format conversion counts and timings"""
+    with _conversion_stats_lock:
+        return {
+            "workers": CONVERSION_WORKERS,
+            "formats": {
+                extension: {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "max_seconds": round(stats["max_seconds"], 3),
+                    "avg_seconds": round(stats["seconds"] / stats["count"], 3) if stats["count"] else 0.0
+                }
+                for extension, stats in _conversion_stats.items()
+            }
+        }
+
+
+def content_object_name(content_hash: str, extension: str) -> str:
+    """Content-addressed object name: identical uploads map to one object, and one collection named after it"""
+    return f"{CONTENT_PREFIX}/{content_hash}.{extension}"
+
+
+def find_by_content_hash(db: Session, content_hash: str, owner_id: Optional[int] = None) -> Optional[UploadedFile]:
+    """Latest upload with these bytes (for one owner if given), preferring ones already processed"""
+    query = db.query(UploadedFile).filter(
+        UploadedFile.content_hash == content_hash,
+        UploadedFile.file_path.isnot(None)
+    )
+    if owner_id is not None:
+        query = query.filter(UploadedFile.owner_id == owner_id)
+    return query.order_by(UploadedFile.embedding_path.is_(None), UploadedFile.id.desc()).first()
+
+
+def object_exists(object_name: str) -> bool:
+    try:
+        minio_client.stat_object(MINIO_BUCKET_NAME, object_name)
+        return True
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            return False
+        raise
+
+
+def store_object(path: str, object_name: str) -> int:
+    """Stream a file into MinIO as a multipart upload of UPLOAD_PART_SIZE parts; returns its size"""
+    start_time = time.time()
+    size = os.path.getsize(path)
+    minio_client.fput_object(MINIO_BUCKET_NAME, object_name, path, part_size=UPLOAD_PART_SIZE)
+    log_info("Object stored in MinIO", context="upload", object_name=object_name, size=size)
+    log_performance("MinIO upload completed", time.time() - start_time, object_name=object_name, size=size)
+    return size
+
+
+def _temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    return path
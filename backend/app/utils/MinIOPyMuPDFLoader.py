@@ -1,30 +1,190 @@
-from typing import List
-from io import BytesIO
-from pypdf import PdfReader  # Use pypdf instead of PyMuPDF
-from langchain.document_loaders.base import BaseLoader
+import time
+from collections import deque
+from typing import Dict, Iterator, List
 from langchain.schema import Document
 from minio import Minio
 
-class MinIOPyMuPDFLoader(BaseLoader):
-    def __init__(self, minio_client: Minio, bucket_name: str, object_name: str):
-        self.minio_client = minio_client
-        self.bucket_name = bucket_name
-        self.object_name = object_name
-
-    def load(self) -> List[Document]:
-        response = self.minio_client.get_object(self.bucket_name, self.object_name)
-        pdf_bytes = response.read()
-        
-        # Use BytesIO to create a file-like object for PdfReader
-        pdf_stream = BytesIO(pdf_bytes)
-        reader = PdfReader(pdf_stream)
-
-        documents = []
-        for i, page in enumerate(reader.pages):
-            text = page.extract_text()
-            metadata = {
-                "source": self.object_name,
-                "page": i + 1
-            }
-            documents.append(Document(page_content=text, metadata=metadata))
-        return documents
\ No newline at end of file
+from app.config import (
+    PDF_DOWNLOAD_PART_SIZE,
+    PDF_DOWNLOAD_CONCURRENCY,
+    PDF_PAGE_WINDOW,
+    PDF_EXTRACT_WORKERS,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_EXTRACTOR_BACKEND,
+    OCR_PAGE_FALLBACK,
+    OCR_MIN_PAGE_CHARS,
+    OCR_WORKERS
+)
+from app.utils.pdf_extraction import (
+    DEFAULT_BACKEND,
+    count_pages,
+    extract_page_range,
+    get_extraction_pool,
+    get_extractor
+)
+from app.utils.minio_spool import MinIOSpooledLoader
+from app.utils.logger import log_info, log_warning, log_performance
+
+
+class MinIOPyMuPDFLoader(MinIOSpooledLoader):
+    """
+    Load a PDF stored in MinIO page by page.
+
+    The object is spooled to a temporary file (see MinIOSpooledLoader) and
+    pages are yielded one at a time, so memory use does not grow with the
+    size of the upload.
+
+    Documents with at least `parallel_min_pages` pages are extracted by a
+    process pool of PDF_EXTRACT_WORKERS processes shared by all loaders: each
+    worker opens the spooled file and extracts a window of pages, and results
+    are yielded back in page order.
+
+    Text is extracted with the `extractor` backend (see app.utils.pdf_extraction);
+    an unavailable backend falls back to pypdf.
+
+    Pages are classified as they are extracted: those with fewer than
+    `ocr_min_chars` characters of text (scans, image-only pages) are sent to
+    OCR and merged back in page order, so OCR cost follows the number of
+    scanned pages rather than the size of the document.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        bucket_name: str,
+        object_name: str,
+        part_size: int = PDF_DOWNLOAD_PART_SIZE,
+        max_concurrency: int = PDF_DOWNLOAD_CONCURRENCY,
+        page_window: int = PDF_PAGE_WINDOW,
+        parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES,
+        extractor: str = PDF_EXTRACTOR_BACKEND,
+        ocr_fallback: bool = OCR_PAGE_FALLBACK,
+        ocr_min_chars: int = OCR_MIN_PAGE_CHARS,
+        ocr_workers: int = OCR_WORKERS,
+    ):
+        super().__init__(minio_client, bucket_name, object_name, part_size, max_concurrency)
+        self.page_window = page_window
+        self.parallel_min_pages = parallel_min_pages
+        self.extractor = self._resolve_extractor(extractor)
+        self.ocr_fallback = ocr_fallback
+        self.ocr_min_chars = ocr_min_chars
+        self.ocr_workers = ocr_workers
+        self._doc_hash = None
+
+    @staticmethod
+    def _resolve_extractor(name: str) -> str:
+        try:
+            return get_extractor(name).name
+        except ValueError as e:
+            log_warning(f"{e}, falling back to {DEFAULT_BACKEND}", context="minio_loader")
+            return DEFAULT_BACKEND
+
+    def lazy_load(self) -> Iterator[Document]:
+        with self.spool() as path:
+            self._doc_hash = None
+            yield from self._iter_pages(path)
+
+    def _iter_pages(self, path: str) -> Iterator[Document]:
+        start_time = time.time()
+        total_pages = count_pages(path, self.extractor)
+        parallel = PDF_EXTRACT_WORKERS > 1 and total_pages >= self.parallel_min_pages
+
+        # Windows of pages: a fresh reader per window also drops pypdf's object cache, keeping RSS flat
+        windows = [
+            (start, min(start + self.page_window, total_pages))
+            for start in range(0, total_pages, self.page_window)
+        ]
+        texts = self._extract_parallel(path, windows) if parallel else self._extract_serial(path, windows)
+
+        pages_ocr = 0
+        for (start, _), window_texts in zip(windows, texts):
+            ocr_texts = self._ocr_low_text_pages(path, start, window_texts) if self.ocr_fallback else {}
+            pages_ocr += len(ocr_texts)
+            for offset, text in enumerate(window_texts):
+                page = start + offset + 1
+                metadata = {
+                    "source": self.object_name,
+                    "page": page,
+                    "extraction_method": "text"
+                }
+                if page in ocr_texts:
+                    text = ocr_texts[page]
+                    metadata["extraction_method"] = "ocr"
+                metadata["text_length"] = len(text)
+                yield Document(page_content=text, metadata=metadata)
+
+        duration = time.time() - start_time
+        log_performance(
+            "PDF text extraction completed",
+            duration,
+            object_name=self.object_name,
+            total_pages=total_pages,
+            mode="parallel" if parallel else "serial",
+            extractor=self.extractor,
+            pages_ocr=pages_ocr,
+            workers=PDF_EXTRACT_WORKERS if parallel else 1,
+            pages_per_second=total_pages / duration if duration > 0 else None
+        )
+
+    def _ocr_low_text_pages(self, path: str, start: int, window_texts: List[str]) -> Dict[int, str]:
+        """OCR the pages of a window whose extracted text is below the threshold; returns {page: text}"""
+        low_text_pages = [
+            start + offset + 1
+            for offset, text in enumerate(window_texts)
+            if len(text.strip()) < self.ocr_min_chars
+        ]
+        if not low_text_pages:
+            return {}
+
+        try:
+            from app.services.ocr_service import ocr_service
+        except ImportError:
+            log_warning("OCR service not available - please install OCR dependencies", context="minio_loader")
+            return {}
+
+        log_info(
+            f"Routing {len(low_text_pages)} low-text pages to OCR",
+            context="minio_loader",
+            object_name=self.object_name,
+            pages=low_text_pages
+        )
+        # Hashed on the first window that needs OCR and reused for the rest of the document
+        if self._doc_hash is None:
+            self._doc_hash = ocr_service.document_hash(path)
+        ocr_texts = {}
+        results = ocr_service.extract_text_from_pdf(
+            path,
+            pages=low_text_pages,
+            workers=self.ocr_workers,
+            doc_hash=self._doc_hash
+        )
+        for result in results:
+            extracted = window_texts[result["page"] - start - 1]
+            # Keep whichever is richer, so a sparse but real text layer is never replaced by worse OCR
+            if len(result["text"].strip()) > len(extracted.strip()):
+                ocr_texts[result["page"]] = result["text"]
+        return ocr_texts
+
+    def _extract_serial(self, path: str, windows) -> Iterator[List[str]]:
+        for start, stop in windows:
+            yield extract_page_range(path, start, stop, self.extractor)
+
+    def _extract_parallel(self, path: str, windows) -> Iterator[List[str]]:
+        # The pool is shared by every loader, so it is sized from config rather than by whichever loader starts it
+        pool = get_extraction_pool(PDF_EXTRACT_WORKERS)
+        # Keep a bounded number of windows in flight so results don't pile up ahead of the consumer
+        max_in_flight = PDF_EXTRACT_WORKERS * 2
+        pending = deque()
+        next_window = 0
+        try:
+            while next_window < len(windows) or pending:
+                while next_window < len(windows) and len(pending) < max_in_flight:
+                    start, stop = windows[next_window]
+                    pending.append(pool.submit(extract_page_range, path, start, stop, self.extractor))
+                    next_window += 1
+                # Futures are consumed in submission order, which is page order
+                yield pending.popleft().result()
+        finally:
+            # The consumer stopped early or a window failed: don't leave work queued against a deleted file
+            for future in pending:
+                future.cancel()
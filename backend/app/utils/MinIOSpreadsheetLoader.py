@@ -0,0 +1,66 @@
+import os
+import time
+from typing import Iterator
+
+from langchain.schema import Document
+from minio import Minio
+
+from app.config import PDF_DOWNLOAD_PART_SIZE, PDF_DOWNLOAD_CONCURRENCY, SPREADSHEET_BATCH_ROWS, SPREADSHEET_BATCH_CHARS
+from app.utils.minio_spool import MinIOSpooledLoader
+from app.utils.spreadsheet_extraction import iter_row_batches
+from app.utils.logger import log_performance
+
+
+class MinIOSpreadsheetLoader(MinIOSpooledLoader):
+    """
+    Load an XLSX or CSV file stored in MinIO as batches of rows.
+
+    Rows are streamed from every sheet and grouped `batch_rows` at a time, each
+    batch repeating its sheet name and header row, so documents are yielded
+    (and can be embedded) while the rest of the file is still being read.
+    Batches stay under `batch_chars` so the chunker keeps each one whole.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        bucket_name: str,
+        object_name: str,
+        part_size: int = PDF_DOWNLOAD_PART_SIZE,
+        max_concurrency: int = PDF_DOWNLOAD_CONCURRENCY,
+        batch_rows: int = SPREADSHEET_BATCH_ROWS,
+        batch_chars: int = SPREADSHEET_BATCH_CHARS,
+    ):
+        super().__init__(minio_client, bucket_name, object_name, part_size, max_concurrency)
+        self.batch_rows = batch_rows
+        self.batch_chars = batch_chars
+
+    def lazy_load(self) -> Iterator[Document]:
+        extension = os.path.splitext(self.object_name)[1].lstrip(".").lower()
+        with self.spool() as path:
+            start_time = time.time()
+            batches = 0
+            sheets = set()
+            for batches, (text, metadata) in enumerate(
+                iter_row_batches(path, extension, self.batch_rows, self.batch_chars), start=1
+            ):
+                sheets.add(metadata["sheet_index"])
+                yield Document(
+                    page_content=text,
+                    metadata={
+                        "source": self.object_name,
+                        "page": batches,
+                        "extraction_method": extension,
+                        "text_length": len(text),
+                        **metadata
+                    }
+                )
+
+            log_performance(
+                "Spreadsheet extraction completed",
+                time.time() - start_time,
+                object_name=self.object_name,
+                format=extension,
+                sheets=len(sheets),
+                batches=batches
+            )
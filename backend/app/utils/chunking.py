@@ -0,0 +1,163 @@
+"""Token-aware chunking that tokenizes each page exactly once."""
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Deque, List, Sequence, Tuple
+
+from langchain.schema import Document
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+Span = Tuple[int, int]
+
+
+def supports_offsets(tokenizer: Any) -> bool:
+    """Offset mappings are only available from Rust-backed ("fast") tokenizers"""
+    return bool(getattr(tokenizer, "is_fast", False))
+
+
+class TokenOffsetChunker:
+    """
+    Drop-in for RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+    tokenizer, chunk_size, chunk_overlap, strip_whitespace=True, separators)
+    whose split_documents() tokenizes each page once.
+
+    A piece's length is its number of tokens, as tokenizer.tokenize() counts
+    them in current langchain-text-splitters releases. Older releases measured
+    len(tokenizer.encode(piece)), which adds special tokens to every piece
+    and join; count_special_tokens=True reproduces that.
+
+    With add_token_counts=True, split_documents() puts each chunk's token
+    count (special tokens excluded) in metadata["token_count"].
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Sequence[str] = DEFAULT_SEPARATORS,
+        count_special_tokens: bool = False,
+        add_token_counts: bool = False,
+    ):
+        if not supports_offsets(tokenizer):
+            raise ValueError("TokenOffsetChunker needs a fast tokenizer (offset mappings)")
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) is larger than chunk_size ({chunk_size})")
+        self.tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+        self.special_tokens = tokenizer.num_special_tokens_to_add() if count_special_tokens else 0
+        self.add_token_counts = add_token_counts
+
+    def split_documents(self, documents: Sequence[Document]) -> List[Document]:
+        chunks = []
+        for document, pieces in zip(documents, self._split_batch([doc.page_content for doc in documents])):
+            for text, tokens in pieces:
+                metadata = dict(document.metadata)
+                if self.add_token_counts:
+                    metadata["token_count"] = tokens
+                chunks.append(Document(page_content=text, metadata=metadata))
+        return chunks
+
+    def split_texts(self, texts: Sequence[str]) -> List[List[str]]:
+        """Chunk several texts with one batched tokenizer call"""
+        return [[text for text, _ in pieces] for pieces in self._split_batch(texts)]
+
+    def _split_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, int]]]:
+        if not texts:
+            return []
+        encoded = self.tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False  # Pages are longer than the model's limit; we only need offsets
+        )
+        return [
+            self._split_text(text, [start for start, _ in offsets])
+            for text, offsets in zip(texts, encoded["offset_mapping"])
+        ]
+
+    def _split_text(self, text: str, token_starts: List[int]) -> List[Tuple[str, int]]:
+        """(chunk, token count) pairs; a chunk's tokens are the page's tokens that start inside it"""
+        special = self.special_tokens
+
+        def tokens(span: Span) -> int:
+            return bisect_left(token_starts, span[1]) - bisect_left(token_starts, span[0])
+
+        def length(span: Span) -> int:
+            return tokens(span) + special
+
+        chunks = []
+        for start, end in self._split_span(text, (0, len(text)), self.separators, length):
+            chunk = text[start:end].strip()
+            if chunk:
+                # Stripped whitespace never starts a token, so the span's count is the chunk's
+                chunks.append((chunk, tokens((start, end))))
+        return chunks
+
+    def _split_span(self, text: str, span: Span, separators: List[str], length: Callable[[Span], int]) -> List[Span]:
+        separator, remaining = separators[-1], []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = ""
+                break
+            if text.find(candidate, span[0], span[1]) != -1:
+                separator, remaining = candidate, separators[i + 1:]
+                break
+
+        chunks: List[Span] = []
+        good: List[Span] = []
+        for piece in _pieces(text, span, separator):
+            if length(piece) < self.chunk_size:
+                good.append(piece)
+                continue
+            if good:
+                chunks.extend(self._merge(good, length))
+                good = []
+            if remaining:
+                chunks.extend(self._split_span(text, piece, remaining, length))
+            else:
+                chunks.append(piece)
+        if good:
+            chunks.extend(self._merge(good, length))
+        return chunks
+
+    def _merge(self, pieces: List[Span], length: Callable[[Span], int]) -> List[Span]:
+        """Greedily pack adjacent pieces up to chunk_size, keeping up to chunk_overlap of the tail"""
+        # Pieces keep their separator and are joined with "", which only has a length in special tokens
+        joiner = self.special_tokens
+        chunks: List[Span] = []
+        current: Deque[Tuple[Span, int]] = deque()
+        total = 0
+        for piece in pieces:
+            size = length(piece)
+            if current and total + size + joiner > self.chunk_size:
+                chunks.append((current[0][0][0], current[-1][0][1]))
+                while total > self.chunk_overlap or (
+                    total + size + (joiner if current else 0) > self.chunk_size and total > 0
+                ):
+                    _, dropped = current.popleft()
+                    total -= dropped + (joiner if current else 0)
+            total += size + (joiner if current else 0)
+            current.append((piece, size))
+        if current:
+            chunks.append((current[0][0][0], current[-1][0][1]))
+        return chunks
+
+
+def _pieces(text: str, span: Span, separator: str) -> List[Span]:
+    """Split a span at each separator, keeping the separator at the start of the following piece"""
+    start, end = span
+    if separator == "":
+        return [(i, i + 1) for i in range(start, end)]
+    bounds = [start]
+    position = text.find(separator, start, end)
+    while position != -1:
+        if position > bounds[-1]:
+            bounds.append(position)
+        position = text.find(separator, position + len(separator), end)
+    bounds.append(end)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
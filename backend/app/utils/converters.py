@@ -1,3 +1,4 @@
+"""File format conversions for uploads."""
 import os
 import platform
 
@@ -31,4 +32,30 @@ def PPTtoPDF(inputFileName, outputFileName, formatType=32):
             powerpoint.Quit()
     except ImportError:
         print("win32com not available - PPT to PDF conversion not supported")
-        return False
\ No newline at end of file
+        return False
+
+
+def image_to_pdf(input_path, output_path):
+    from PIL import Image
+    with Image.open(input_path) as image:
+        image.convert("RGB").save(output_path, format="PDF")
+
+
+def excel_to_csv(input_path, output_path):
+    import pandas as pd
+    pd.read_excel(input_path).to_csv(output_path, index=False)
+
+
+# Upload extension -> (stored extension, converter)
+CONVERSIONS = {
+    **{extension: ("pdf", image_to_pdf) for extension in ["png", "jpg", "jpeg", "tif", "tiff", "bmp", "webp"]},
+    # Legacy .xls has no native extractor; DOCX, PPTX and XLSX are stored as uploaded
+    "xls": ("csv", excel_to_csv),
+}
+
+
+def convert_file(input_path, output_path, extension):
+    """Convert `input_path` (an upload with the given extension) into `output_path`; returns the output size"""
+    _, converter = CONVERSIONS[extension]
+    converter(input_path, output_path)
+    return os.path.getsize(output_path)
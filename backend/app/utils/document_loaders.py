@@ -0,0 +1,17 @@
+from minio import Minio
+
+from app.utils.minio_spool import MinIOSpooledLoader
+from app.utils.MinIOOfficeLoader import MinIOOfficeLoader
+from app.utils.MinIOPyMuPDFLoader import MinIOPyMuPDFLoader
+from app.utils.MinIOSpreadsheetLoader import MinIOSpreadsheetLoader
+from app.utils.office_extraction import OFFICE_EXTENSIONS
+from app.utils.spreadsheet_extraction import SPREADSHEET_EXTENSIONS
+
+
+def get_loader(minio_client: Minio, bucket_name: str, object_name: str, file_type: str) -> MinIOSpooledLoader:
+    """Pick the loader for an uploaded file's type; spreadsheets and Office formats are read natively, everything else as PDF"""
+    if file_type.lower() in SPREADSHEET_EXTENSIONS:
+        return MinIOSpreadsheetLoader(minio_client, bucket_name, object_name)
+    if file_type.lower() in OFFICE_EXTENSIONS:
+        return MinIOOfficeLoader(minio_client, bucket_name, object_name)
+    return MinIOPyMuPDFLoader(minio_client, bucket_name, object_name)
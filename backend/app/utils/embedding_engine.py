@@ -0,0 +1,101 @@
+"""Batched embedding of chunks with a SentenceTransformer model."""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+from sentence_transformers.util import batch_to_device
+
+
+class EmbeddingEngine:
+    """
+    Embed texts with an already loaded SentenceTransformer:
+
+        engine = EmbeddingEngine(model, batch_size=32, num_threads=4)
+        matrix = engine.embed(texts)  # (len(texts), dimension) float32, C-contiguous
+
+    Vectors are the same as model.encode() gives (same modules, same
+    truncation at max_seq_length); only the batching differs.
+    num_threads > 0 sets torch's intra-op thread count for the process.
+
+    The ingestion stage and the query dispatcher call embed() from different
+    threads; tokenizer calls are serialised because a fast tokenizer keeps
+    its truncation and padding settings as state shared by every caller.
+    """
+
+    def __init__(self, model: Any, batch_size: int = 32, num_threads: int = 0):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        self.model = model
+        self.batch_size = batch_size
+        self.dimension = model.get_sentence_embedding_dimension()
+        self.max_length = model.max_seq_length
+        self._stats = {"calls": 0, "chunks": 0, "batches": 0, "tokens": 0, "padded_tokens": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        self._tokenizer_lock = threading.Lock()
+
+    def token_lengths(self, texts: Sequence[str]) -> List[int]:
+        """Token length of each text as the model sees it: special tokens included, truncated"""
+        with self._tokenizer_lock:
+            encoded = self.model.tokenizer(
+                list(texts),
+                truncation=True,
+                max_length=self.max_length,
+                return_attention_mask=False,
+                return_token_type_ids=False
+            )
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def embed(self, texts: Sequence[str], lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Embed texts into a (len(texts), dimension) float32 matrix, row i for texts[i].
+        `lengths` (token counts, e.g. the chunks' token_count) saves tokenizing
+        twice; they only decide the batching, so estimates are fine.
+        """
+        start_time = time.time()
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return output
+        if lengths is None:
+            lengths = self.token_lengths(texts)
+
+        # Longest first, like SentenceTransformer.encode, so an oversized batch fails early
+        order = np.argsort(-np.minimum(np.asarray(lengths), self.max_length), kind="stable")
+        batches = tokens = padded_tokens = 0
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                rows = order[start:start + self.batch_size]
+                with self._tokenizer_lock:
+                    features = self.model.tokenize([texts[i] for i in rows])
+                mask = features["attention_mask"]
+                tokens += int(mask.sum())
+                padded_tokens += mask.numel()
+                features = batch_to_device(features, self.model.device)
+                embeddings = self.model.forward(features)["sentence_embedding"]
+                output[rows] = embeddings.float().cpu().numpy()
+                batches += 1
+
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["chunks"] += len(texts)
+            self._stats["batches"] += batches
+            self._stats["tokens"] += tokens
+            self._stats["padded_tokens"] += padded_tokens
+            self._stats["seconds"] += time.time() - start_time
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and how much of each forward pass was padding"""
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            "seconds": round(stats["seconds"], 3),
+            "batch_size": self.batch_size,
+            "torch_threads": torch.get_num_threads(),
+            "chunks_per_second": round(stats["chunks"] / stats["seconds"], 2) if stats["seconds"] else 0.0,
+            "padding_ratio": round(1 - stats["tokens"] / stats["padded_tokens"], 3) if stats["padded_tokens"] else 0.0
+        }
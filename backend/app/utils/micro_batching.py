@@ -0,0 +1,140 @@
+"""
+Coalesce concurrent single-item calls into batched calls on one thread.
+
+Request threads submit an item and wait on a Future. A dispatcher thread takes
+the first waiting item, collects whatever else arrives within a short window
+(or until the batch is full), runs the batch function once and resolves every
+Future with its own result. While a batch is running new items queue up and
+form the next batch, so under load the batch size grows by itself and a lone
+request waits at most the window.
+"""
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Sequence
+
+
+class Histogram:
+    """Counts of observed values per bucket; a value goes in the first bucket whose bound is >= it"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        buckets = {f"<={bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3)
+        }
+
+
+class MicroBatcher:
+    """
+    Batch concurrent calls to `func`, which takes a list of distinct items
+    and returns one result per item, in order:
+
+        batcher = MicroBatcher("query-embedding", lambda texts: engine.embed(texts), max_wait_ms=5)
+        vector = batcher.submit(question).result()
+
+    Items must be hashable; identical items submitted together are computed
+    once. An exception from `func` is set on every Future of its batch.
+    """
+
+    def __init__(self, name: str, func: Callable[[List[Hashable]], Sequence[Any]], max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.name = name
+        self.func = func
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self._queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100, 500])
+        self._stats = {"batches": 0, "items": 0, "computed": 0, "failed_batches": 0, "seconds": 0.0}
+
+    def submit(self, item: Hashable) -> Future:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _ensure_started(self):
+        # A forked child inherits the queue but not the thread: start afresh
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Past the window, still take whatever is already waiting
+                    batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Any]):
+        started = time.perf_counter()
+        items = list(dict.fromkeys(item for item, _, _ in batch))
+        try:
+            results = dict(zip(items, self.func(items)))
+            error = None
+        except Exception as e:
+            results, error = {}, e
+
+        for item, future, _ in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[item])
+
+        with self._lock:
+            for _, _, enqueued in batch:
+                self._queue_wait_ms.observe((started - enqueued) * 1000)
+            self._batch_sizes.observe(len(batch))
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["computed"] += len(items)
+            self._stats["failed_batches"] += error is not None
+            self._stats["seconds"] += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "seconds": round(self._stats["seconds"], 3),
+                "queued": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batch_size": self._batch_sizes.as_dict(),
+                "queue_wait_ms": self._queue_wait_ms.as_dict()
+            }
@@ -0,0 +1,88 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+from langchain.document_loaders.base import BaseLoader
+from minio import Minio
+
+from app.config import PDF_DOWNLOAD_PART_SIZE, PDF_DOWNLOAD_CONCURRENCY
+from app.utils.logger import log_info
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class MinIOSpooledLoader(BaseLoader):
+    """
+    Base for loaders that parse a MinIO object from local disk.
+
+    The object is spooled to a temporary file (large objects are fetched with
+    concurrent ranged GETs), parsed by the subclass's lazy_load, and removed
+    afterwards, so memory use does not grow with the size of the upload.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        bucket_name: str,
+        object_name: str,
+        part_size: int = PDF_DOWNLOAD_PART_SIZE,
+        max_concurrency: int = PDF_DOWNLOAD_CONCURRENCY,
+    ):
+        self.minio_client = minio_client
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+
+    @contextmanager
+    def spool(self) -> Iterator[str]:
+        """Download the object to a temporary file and yield its path; the file is removed on exit"""
+        size = self.minio_client.stat_object(self.bucket_name, self.object_name).size
+        suffix = os.path.splitext(self.object_name)[1]
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            if size > self.part_size and self.max_concurrency > 1:
+                self._download_ranges(path, size)
+            else:
+                self._download_range(path, 0, size)
+            log_info(
+                "Object spooled to temporary file",
+                context="minio_loader",
+                object_name=self.object_name,
+                size=size
+            )
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _download_ranges(self, path: str, size: int):
+        # Pre-size the file so every range can be written in place
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+        ranges = [(offset, min(self.part_size, size - offset)) for offset in range(0, size, self.part_size)]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(ranges))) as executor:
+            # list() re-raises the first download error
+            list(executor.map(lambda r: self._download_range(path, *r), ranges))
+
+    def _download_range(self, path: str, offset: int, length: int):
+        response = self.minio_client.get_object(self.bucket_name, self.object_name, offset=offset, length=length)
+        written = 0
+        try:
+            with open(path, "r+b") as f:
+                f.seek(offset)
+                for chunk in response.stream(STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+        if written != length:
+            raise IOError(f"Short read from MinIO for {self.object_name}: expected {length} bytes at {offset}, got {written}")
+
+    def load(self):
+        return list(self.lazy_load())
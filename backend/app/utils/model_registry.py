@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+from app.config import MODEL_NAME, EMBEDDING_ENCODE_BATCH_SIZE, EMBEDDING_TORCH_THREADS
+from app.utils.logger import log_performance
+
+
+class ModelRegistry:
+    """
+    Heavy models of the process, each loaded once on first use (or by
+    warm_up_models) instead of at import, so a process only pays time and
+    memory for what it uses. Load time and the RSS growth of every load are
+    kept for /metrics.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._reports: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+
+    def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name in self._models:
+                return self._models[name]
+            if name not in self._loaders:
+                raise KeyError(f"No model registered as {name!r}")
+
+            process = psutil.Process()
+            rss_before = process.memory_info().rss
+            start_time = time.time()
+            model = self._loaders[name]()
+            duration = time.time() - start_time
+            rss_delta_mb = (process.memory_info().rss - rss_before) / 1024 / 1024
+
+            self._models[name] = model
+            self._reports[name] = {"seconds": round(duration, 3), "rss_delta_mb": round(rss_delta_mb, 1)}
+            log_performance(f"Model loaded: {name}", duration, model=name, rss_delta_mb=round(rss_delta_mb, 1))
+            return model
+
+    def peek(self, name: str) -> Optional[Any]:
+        """The model if it is already loaded, without loading it"""
+        return self._models.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": dict(self._reports),
+                "not_loaded": sorted(set(self._loaders) - set(self._models)),
+                "rss_mb": round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+            }
+
+
+def _load_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(MODEL_NAME)
+
+
+def _load_embedding_engine():
+    from sentence_transformers import SentenceTransformer
+    from app.utils.embedding_engine import EmbeddingEngine
+
+    # The model keeps its own tokenizer: a fast tokenizer holds truncation and
+    # padding as shared state, and the embedder truncates where chunking must not
+    model = SentenceTransformer(MODEL_NAME, device="cpu")
+    return EmbeddingEngine(model, batch_size=EMBEDDING_ENCODE_BATCH_SIZE, num_threads=EMBEDDING_TORCH_THREADS)
+
+
+model_registry = ModelRegistry()
+model_registry.register("tokenizer", _load_tokenizer)
+model_registry.register("embedding_engine", _load_embedding_engine)
+
+
+def get_tokenizer():
+    """The MODEL_NAME tokenizer used for chunking and token counts (never with truncation or padding)"""
+    return model_registry.get("tokenizer")
+
+
+def get_embedding_engine():
+    """The MODEL_NAME embedder (EmbeddingEngine) used for chunks and questions"""
+    return model_registry.get("embedding_engine")
+
+
+def warm_up_models() -> Dict[str, Any]:
+    """
+    Warm-up hook: load every model and run one embedding, so the first
+    upload or question does not pay for loading or torch's first forward pass.
+    """
+    start_time = time.time()
+    get_tokenizer()
+    get_embedding_engine().embed(["warm-up"])
+    stats = model_registry.stats()
+    log_performance(
+        "Models warmed up",
+        time.time() - start_time,
+        models=list(stats["loaded"]),
+        rss_mb=stats["rss_mb"]
+    )
+    return stats
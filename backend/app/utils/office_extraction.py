@@ -0,0 +1,111 @@
+"""Native text extraction for Office documents, without a PDF round-trip."""
+from typing import Any, Dict, Iterator, List, Tuple
+
+Section = Tuple[str, Dict[str, Any]]
+
+OFFICE_EXTENSIONS = {"docx", "pptx"}
+
+# Headings deeper than this stay inside their parent section
+DOCX_SECTION_HEADING_LEVEL = 2
+
+
+def iter_docx_sections(path: str) -> Iterator[Section]:
+    """Paragraphs and tables in reading order, split into a section at each top-level heading"""
+    from docx import Document as DocxDocument
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = DocxDocument(path)
+    section = 1
+    heading = None
+    lines: List[str] = []
+
+    for element in document.element.body.iterchildren():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            paragraph = Paragraph(element, document)
+            text = paragraph.text.strip()
+            level = _heading_level(paragraph)
+            if level is not None and level <= DOCX_SECTION_HEADING_LEVEL and text:
+                if lines:
+                    yield "\n".join(lines), {"section": section, "heading": heading}
+                    section += 1
+                    lines = []
+                heading = text
+            if text:
+                lines.append(text)
+        elif tag == "tbl":
+            lines.extend(_table_rows(Table(element, document)))
+
+    if lines:
+        yield "\n".join(lines), {"section": section, "heading": heading}
+
+
+def _heading_level(paragraph) -> Any:
+    style_name = (paragraph.style.name if paragraph.style is not None else "") or ""
+    if style_name == "Title":
+        return 0
+    if style_name.startswith("Heading"):
+        try:
+            return int(style_name.split()[-1])
+        except ValueError:
+            return 1
+    return None
+
+
+def _table_rows(table) -> List[str]:
+    rows = []
+    for row in table.rows:
+        cells = [cell.text.strip() for cell in row.cells]
+        # Merged cells repeat their text in every grid position they span
+        deduped = [cell for i, cell in enumerate(cells) if i == 0 or cell != cells[i - 1]]
+        if any(deduped):
+            rows.append(" | ".join(deduped))
+    return rows
+
+
+def iter_pptx_slides(path: str) -> Iterator[Section]:
+    """One section per slide: title, text frames and tables in shape order, then speaker notes"""
+    from pptx import Presentation
+
+    presentation = Presentation(path)
+    for number, slide in enumerate(presentation.slides, start=1):
+        title_shape = slide.shapes.title
+        title = title_shape.text_frame.text.strip() if title_shape is not None and title_shape.has_text_frame else None
+        lines = _shape_lines(slide.shapes)
+        if slide.has_notes_slide:
+            notes = slide.notes_slide.notes_text_frame.text.strip()
+            if notes:
+                lines.append(f"Notes: {notes}")
+        if lines:
+            yield "\n".join(lines), {"slide": number, "title": title}
+
+
+def _shape_lines(shapes) -> List[str]:
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+    lines = []
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            lines.extend(_shape_lines(shape.shapes))
+        elif getattr(shape, "has_table", False) and shape.has_table:
+            lines.extend(_table_rows(shape.table))
+        elif shape.has_text_frame:
+            text = shape.text_frame.text.strip()
+            if text:
+                lines.append(text)
+    return lines
+
+
+EXTRACTORS = {
+    "docx": iter_docx_sections,
+    "pptx": iter_pptx_slides,
+}
+
+
+def iter_sections(path: str, extension: str) -> Iterator[Section]:
+    """Sections of an Office file; raises ValueError for formats without a native extractor"""
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        raise ValueError(f"No native extractor for '{extension}', expected one of {', '.join(EXTRACTORS)}")
+    return extractor(path)
@@ -0,0 +1,165 @@
+"""PDF text extraction helpers that can run in worker processes."""
+import importlib.util
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+DEFAULT_BACKEND = "pypdf"
+
+
+class PdfTextExtractor:
+    """Extract per-page text from a PDF on disk"""
+    name = ""
+    module = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    def count_pages(self, path: str) -> int:
+        raise NotImplementedError
+
+    def extract_pages(self, path: str, start: int, stop: int) -> List[str]:
+        """Return the text of pages [start, stop)"""
+        raise NotImplementedError
+
+
+class PypdfExtractor(PdfTextExtractor):
+    name = "pypdf"
+    module = "pypdf"
+
+    def count_pages(self, path: str) -> int:
+        from pypdf import PdfReader
+        with open(path, "rb") as f:
+            return len(PdfReader(f).pages)
+
+    def extract_pages(self, path: str, start: int, stop: int) -> List[str]:
+        from pypdf import PdfReader
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+class PdfminerExtractor(PdfTextExtractor):
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def count_pages(self, path: str) -> int:
+        from pdfminer.pdfpage import PDFPage
+        with open(path, "rb") as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def extract_pages(self, path: str, start: int, stop: int) -> List[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        texts = []
+        for page_layout in extract_pages(path, page_numbers=range(start, stop)):
+            texts.append("".join(
+                element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+            ))
+        return texts
+
+
+class PdfiumExtractor(PdfTextExtractor):
+    name = "pdfium"
+    module = "pypdfium2"
+
+    def count_pages(self, path: str) -> int:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract_pages(self, path: str, start: int, stop: int) -> List[str]:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(path)
+        texts = []
+        try:
+            for i in range(start, stop):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return texts
+
+
+class PyMuPDFExtractor(PdfTextExtractor):
+    name = "pymupdf"
+    module = "pymupdf"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return any(importlib.util.find_spec(name) is not None for name in ("pymupdf", "fitz"))
+
+    @staticmethod
+    def _open(path: str):
+        try:
+            import pymupdf
+        except ImportError:
+            # Releases before 1.24 only ship the legacy module name
+            import fitz as pymupdf
+        return pymupdf.open(path)
+
+    def count_pages(self, path: str) -> int:
+        with self._open(path) as doc:
+            return doc.page_count
+
+    def extract_pages(self, path: str, start: int, stop: int) -> List[str]:
+        with self._open(path) as doc:
+            return [doc.load_page(i).get_text() for i in range(start, stop)]
+
+
+EXTRACTORS: Dict[str, PdfTextExtractor] = {
+    extractor.name: extractor
+    for extractor in (PypdfExtractor(), PdfminerExtractor(), PdfiumExtractor(), PyMuPDFExtractor())
+}
+
+
+def available_extractors() -> List[str]:
+    return [name for name, extractor in EXTRACTORS.items() if extractor.is_available()]
+
+
+def get_extractor(name: str = DEFAULT_BACKEND) -> PdfTextExtractor:
+    """Return the named backend; raises ValueError if it is unknown or not installed"""
+    extractor = EXTRACTORS.get(name)
+    if extractor is None:
+        raise ValueError(f"Unknown PDF extractor '{name}', expected one of {', '.join(EXTRACTORS)}")
+    if not extractor.is_available():
+        raise ValueError(f"PDF extractor '{name}' requires the '{extractor.module}' package")
+    return extractor
+
+
+def count_pages(path: str, backend: str = DEFAULT_BACKEND) -> int:
+    return get_extractor(backend).count_pages(path)
+
+
+def extract_page_range(path: str, start: int, stop: int, backend: str = DEFAULT_BACKEND) -> List[str]:
+    """Extract the text of pages [start, stop) of the PDF at `path`"""
+    return get_extractor(backend).extract_pages(path, start, stop)
+
+
+def get_extraction_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all loaders in this process, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: the parent runs job threads, Redis clients and torch, which don't survive a fork
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_extraction_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
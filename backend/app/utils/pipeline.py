@@ -0,0 +1,225 @@
+"""
+A staged pipeline of threads connected by bounded queues.
+
+The source iterator and every stage run concurrently, so while one batch is
+being embedded the next is being chunked and the previous one upserted. Each
+queue holds at most `queue_size` items: a slow stage blocks the ones feeding
+it (backpressure) instead of letting batches pile up in memory, and the
+end-to-end time tends towards that of the slowest stage rather than the sum
+of all of them.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_END = object()
+# How often blocked threads check whether the pipeline was stopped by an error
+_POLL_SECONDS = 0.1
+
+
+class _StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.starved_seconds = 0.0  # Waiting on an empty input queue
+        self.blocked_seconds = 0.0  # Waiting on a full output queue
+        self.max_queue_depth = 0
+        self.queue_depth_total = 0
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.time()) - self.started if self.started else 0.0
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "starved_seconds": round(self.starved_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(self.items_in / elapsed, 2) if elapsed else 0.0,
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": round(self.queue_depth_total / self.items_in, 2) if self.items_in else 0.0
+        }
+
+
+class _Stage:
+    def __init__(self, name: str, func: Callable[[Any], Optional[Iterable[Any]]], workers: int, queue_size: int):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.input: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.stats = _StageStats(name, workers)
+        self.running = workers
+
+
+class Pipeline:
+    """
+    Run `source` through stages added with add_stage().
+
+    A stage function takes one item and returns an iterable of items for the
+    next stage (or None); the last stage's outputs are discarded. The first
+    exception raised anywhere stops every thread and is re-raised by run().
+
+        pipeline = Pipeline("ingestion", windows, queue_size=4)
+        pipeline.add_stage("chunking", chunk)
+        pipeline.add_stage("embedding", embed)
+        pipeline.add_stage("upserting", upsert, workers=2)
+        stats = pipeline.run()
+    """
+
+    def __init__(self, name: str, source: Iterable[Any], source_name: str = "extraction", queue_size: int = 4):
+        self.name = name
+        self.source = source
+        self.queue_size = queue_size
+        self.source_stats = _StageStats(source_name, 1)
+        self.stages: List[_Stage] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def add_stage(self, name: str, func: Callable[[Any], Optional[Iterable[Any]]], workers: int = 1) -> "Pipeline":
+        self.stages.append(_Stage(name, func, max(1, workers), self.queue_size))
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """Block until every item has gone through every stage; returns per-stage metrics"""
+        if not self.stages:
+            raise ValueError("Pipeline has no stages")
+
+        start_time = time.time()
+        threads = [threading.Thread(target=self._run_source, name=f"{self.name}-{self.source_stats.name}", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_stage,
+                    args=(index,),
+                    name=f"{self.name}-{stage.name}-{worker}",
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return self.stats(time.time() - start_time)
+
+    def stats(self, elapsed: float = None) -> Dict[str, Any]:
+        stages = {self.source_stats.name: self.source_stats.as_dict()}
+        stages.update({stage.name: stage.stats.as_dict() for stage in self.stages})
+        result = {
+            "stages": stages,
+            # The stage that was busy for the largest share of its time sets the pace
+            "bottleneck": max(stages, key=lambda name: stages[name]["utilization"])
+        }
+        if elapsed is not None:
+            result["seconds"] = round(elapsed, 3)
+            result["sum_of_stage_seconds"] = round(sum(stage["busy_seconds"] for stage in stages.values()), 3)
+        return result
+
+    def _fail(self, error: BaseException):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, target: "queue.Queue[Any]", item: Any, stats: _StageStats) -> bool:
+        """Put with backpressure; False if the pipeline was stopped while waiting"""
+        waited = time.time()
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                with stats.lock:
+                    stats.blocked_seconds += time.time() - waited
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_source(self):
+        stats = self.source_stats
+        stats.started = time.time()
+        first = self.stages[0]
+        iterator = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                started = time.time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                stats.busy_seconds += time.time() - started
+                stats.items_in += 1
+                if not self._put(first.input, item, stats):
+                    return
+                stats.items_out += 1
+        except BaseException as e:
+            self._fail(e)
+            return
+        finally:
+            stats.finished = time.time()
+            # Let a generator source run its cleanup (e.g. removing a spooled file) if we stop early
+            close = getattr(iterator, "close", None)
+            if close is not None and self._stop.is_set():
+                close()
+        for _ in range(first.workers):
+            self._put(first.input, _END, stats)
+
+    def _run_stage(self, index: int):
+        stage = self.stages[index]
+        stats = stage.stats
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        with stats.lock:
+            stats.started = stats.started or time.time()
+
+        try:
+            while not self._stop.is_set():
+                waited = time.time()
+                try:
+                    item = stage.input.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    with stats.lock:
+                        stats.starved_seconds += time.time() - waited
+                    continue
+                depth = stage.input.qsize()
+                with stats.lock:
+                    stats.starved_seconds += time.time() - waited
+                if item is _END:
+                    break
+
+                started = time.time()
+                outputs = stage.func(item)
+                outputs = list(outputs) if outputs is not None else []
+                with stats.lock:
+                    stats.busy_seconds += time.time() - started
+                    stats.items_in += 1
+                    stats.max_queue_depth = max(stats.max_queue_depth, depth + 1)
+                    stats.queue_depth_total += depth + 1
+
+                if downstream is not None:
+                    for output in outputs:
+                        if not self._put(downstream.input, output, stats):
+                            return
+                with stats.lock:
+                    stats.items_out += len(outputs)
+        except BaseException as e:
+            self._fail(e)
+            return
+
+        # The last worker of a stage to finish passes the end marker downstream
+        with stats.lock:
+            stage.running -= 1
+            last = stage.running == 0
+            if last:
+                stats.finished = time.time()
+        if last and downstream is not None:
+            for _ in range(downstream.workers):
+                self._put(downstream.input, _END, stats)
@@ -69,4 +69,32 @@ REQUIREMENTS:
 DOCUMENT CONTENT:
 {{context}}
 
-QUESTIONS:"""
\ No newline at end of file
+QUESTIONS:"""
+
+def custom_table_query_prompt_template():
+    # Not an f-string: doubled braces are literal JSON for ChatPromptTemplate
+    return """You translate questions about a spreadsheet into a JSON query plan. You never answer the question yourself.
+
+TABLES (name, row count, columns with types, sample rows):
+{schema}
+
+PLAN FORMAT:
+{{"sheet": "<table name>",
+ "filters": [{{"column": "<column>", "op": "==|!=|>|>=|<|<=|contains|in", "value": <value or list for in>}}],
+ "group_by": ["<column>"],
+ "aggregations": [{{"column": "<column or * for row count>", "func": "sum|mean|median|min|max|count|nunique", "as": "<result name>"}}],
+ "columns": ["<column>"],
+ "sort": [{{"column": "<column or aggregation name>", "descending": true}}],
+ "limit": <number>}}
+
+REQUIREMENTS:
+- Output a single JSON object only, with no explanation
+- Use exact column names from the tables above
+- Omit keys you do not need; "columns" is only for listing rows without aggregations
+- If the question cannot be answered by filtering, grouping or aggregating these tables, output {{"tabular": false}}
+- Do not use thinking tags or show reasoning process
+
+USER QUESTION:
+{question}
+
+PLAN:"""
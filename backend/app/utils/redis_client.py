@@ -0,0 +1,62 @@
+import importlib.util
+import threading
+import time
+from typing import Optional
+
+from app.config import REDIS_URL, REDIS_PASSWORD
+from app.utils.logger import log_info, log_warning
+
+RETRY_AFTER_SECONDS = 30
+
+_client = None
+_lock = threading.Lock()
+_unavailable_until = 0.0
+
+
+def get_redis():
+    """
+    Shared Redis client for the optional cache tiers, created on first use.
+
+    Returns None when the redis package is not installed or the server is
+    unreachable; a failed connection is retried after RETRY_AFTER_SECONDS, so
+    callers can treat Redis as best-effort and simply skip the tier.
+    """
+    global _client, _unavailable_until
+    if _client is not None:
+        return _client
+    if time.time() < _unavailable_until:
+        return None
+
+    with _lock:
+        if _client is not None:
+            return _client
+        if importlib.util.find_spec("redis") is None:
+            _unavailable_until = float("inf")
+            log_warning("redis package not installed, Redis cache tier disabled", context="redis")
+            return None
+        try:
+            import redis
+            client = redis.Redis.from_url(
+                REDIS_URL,
+                password=REDIS_PASSWORD,
+                socket_timeout=2,
+                socket_connect_timeout=2
+            )
+            client.ping()
+            _client = client
+            log_info("Connected to Redis", context="redis", url=REDIS_URL)
+            return _client
+        except Exception as e:
+            _unavailable_until = time.time() + RETRY_AFTER_SECONDS
+            log_warning(f"Redis unavailable: {e}", context="redis")
+            return None
+
+
+def mark_redis_failed(error: Optional[Exception] = None):
+    """Drop the shared client after an operation failed, so the next get_redis() reconnects (after a pause)"""
+    global _client, _unavailable_until
+    with _lock:
+        _client = None
+        _unavailable_until = time.time() + RETRY_AFTER_SECONDS
+    if error is not None:
+        log_warning(f"Redis operation failed: {error}", context="redis")
@@ -0,0 +1,134 @@
+"""Streaming row-batch extraction for spreadsheets (XLSX and CSV)."""
+import csv
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Section = Tuple[str, Dict[str, Any]]
+
+SPREADSHEET_EXTENSIONS = {"xlsx", "csv"}
+
+DEFAULT_BATCH_ROWS = 50
+# Keep a batch below the chunker's size so it is never split away from its header
+DEFAULT_BATCH_CHARS = 2000
+CSV_SNIFF_BYTES = 64 * 1024
+CELL_SEPARATOR = " | "
+
+
+def iter_xlsx_rows(path: str) -> Iterator[Tuple[str, int, Iterator[Tuple[int, List[str]]]]]:
+    """(sheet title, sheet index, rows) for every worksheet; rows are (row number, cell strings)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for index, sheet in enumerate(workbook.worksheets, start=1):
+            rows = (
+                (number, [_cell(value) for value in row])
+                for number, row in enumerate(sheet.iter_rows(values_only=True), start=1)
+            )
+            yield sheet.title, index, rows
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(path: str) -> Iterator[Tuple[str, int, Iterator[Tuple[int, List[str]]]]]:
+    """A CSV file as a single sheet, with its encoding and delimiter sniffed from the start of the file"""
+    encoding = _detect_encoding(path)
+    with open(path, newline="", encoding=encoding, errors="replace") as f:
+        sample = f.read(CSV_SNIFF_BYTES)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        rows = ((number, [value.strip() for value in row]) for number, row in enumerate(csv.reader(f, dialect), start=1))
+        yield "csv", 1, rows
+
+
+def _detect_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        sample = f.read(CSV_SNIFF_BYTES)
+    try:
+        sample.decode("utf-8-sig")
+        return "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is still UTF-8
+        if e.start >= len(sample) - 3:
+            return "utf-8-sig"
+        return "latin-1"
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_row_batches(
+    path: str,
+    extension: str,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    batch_chars: int = DEFAULT_BATCH_CHARS,
+) -> Iterator[Section]:
+    """
+    Row batches across all sheets. The first non-empty row of each sheet is
+    its header; each batch is "Sheet: <title>", the header, then up to
+    `batch_rows` rows (fewer if they pass `batch_chars`).
+    """
+    readers = {"xlsx": iter_xlsx_rows, "csv": iter_csv_rows}
+    reader = readers.get(extension.lower())
+    if reader is None:
+        raise ValueError(f"No spreadsheet reader for '{extension}', expected one of {', '.join(readers)}")
+    for title, index, rows in reader(path):
+        yield from _sheet_batches(title, index, rows, batch_rows, batch_chars)
+
+
+def _sheet_batches(
+    title: str,
+    index: int,
+    rows: Iterable[Tuple[int, List[str]]],
+    batch_rows: int,
+    batch_chars: int,
+) -> Iterator[Section]:
+    header: Optional[List[str]] = None
+    prefix = ""
+    batch: List[str] = []
+    batch_size = 0
+    first_row = last_row = 0
+
+    for number, values in rows:
+        while values and not values[-1]:
+            values.pop()
+        if not values:
+            continue
+
+        if header is None:
+            header = values
+            prefix = f"Sheet: {title}\n{CELL_SEPARATOR.join(header)}\n"
+            continue
+
+        line = CELL_SEPARATOR.join(values)
+        if batch and (len(batch) >= batch_rows or len(prefix) + batch_size + len(line) > batch_chars):
+            yield _batch_section(prefix, batch, title, index, header, first_row, last_row)
+            batch, batch_size = [], 0
+        if not batch:
+            first_row = number
+        batch.append(line)
+        batch_size += len(line) + 1
+        last_row = number
+
+    if batch:
+        yield _batch_section(prefix, batch, title, index, header, first_row, last_row)
+    elif header is not None:
+        # A header with no data rows is still content
+        yield prefix.rstrip("\n"), {"sheet": title, "sheet_index": index, "columns": len(header)}
+
+
+def _batch_section(prefix: str, batch: List[str], title: str, index: int, header: List[str], first_row: int, last_row: int) -> Section:
+    return prefix + "\n".join(batch), {
+        "sheet": title,
+        "sheet_index": index,
+        "row_start": first_row,
+        "row_end": last_row,
+        "columns": len(header)
+    }
@@ -0,0 +1,206 @@
+"""Typed tables for spreadsheets and a small, whitelisted query executor."""
+import math
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.spreadsheet_extraction import iter_csv_rows, iter_xlsx_rows
+
+FILTER_OPS = {"==", "!=", ">", ">=", "<", "<=", "contains", "in"}
+AGGREGATIONS = {"sum", "mean", "median", "min", "max", "count", "nunique"}
+
+
+class PlanError(ValueError):
+    """A query plan that does not fit the table (unknown column, operator or aggregation)"""
+
+
+def iter_sheet_frames(path: str, extension: str) -> Iterator[Tuple[str, int, pd.DataFrame]]:
+    """(sheet title, sheet index, typed DataFrame) for every sheet with a header row"""
+    readers = {"xlsx": iter_xlsx_rows, "csv": iter_csv_rows}
+    reader = readers.get(extension.lower())
+    if reader is None:
+        raise ValueError(f"No spreadsheet reader for '{extension}', expected one of {', '.join(readers)}")
+
+    for title, index, rows in reader(path):
+        header = None
+        data: List[List[str]] = []
+        for _, values in rows:
+            while values and not values[-1]:
+                values.pop()
+            if not values:
+                continue
+            if header is None:
+                header = _column_names(values)
+                continue
+            # Cells past the header have no column to go in
+            data.append(values[:len(header)] + [""] * (len(header) - len(values)))
+        if header is not None:
+            yield title, index, _typed(pd.DataFrame(data, columns=header))
+
+
+def _column_names(values: List[str]) -> List[str]:
+    names: List[str] = []
+    for i, value in enumerate(values, start=1):
+        name = value or f"column_{i}"
+        candidate, n = name, 2
+        while candidate in names:
+            candidate = f"{name}_{n}"
+            n += 1
+        names.append(candidate)
+    return names
+
+
+def _typed(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convert columns whose non-empty cells all parse as numbers (or ISO dates)"""
+    for column in frame.columns:
+        values = frame[column].mask(frame[column] == "")
+        present = values.notna().sum()
+        if not present:
+            frame[column] = values
+            continue
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == present:
+            frame[column] = numeric
+            continue
+        dates = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        frame[column] = dates if dates.notna().sum() == present else values
+    return frame
+
+
+def describe_frame(frame: pd.DataFrame, sample_rows: int = 3) -> Dict[str, Any]:
+    """Column names, dtypes and a few sample rows, for the manifest and the query planner"""
+    return {
+        "rows": len(frame),
+        "columns": [{"name": column, "dtype": str(frame[column].dtype)} for column in frame.columns],
+        "sample": [[_format_value(value) for value in row] for row in frame.head(sample_rows).itertuples(index=False)]
+    }
+
+
+def execute_plan(frame: pd.DataFrame, plan: Dict[str, Any], max_rows: int) -> Tuple[pd.DataFrame, int]:
+    """
+    Run a plan against a table. Returns the result (at most `max_rows` rows)
+    and the number of rows it had before the limit.
+
+        {"filters": [{"column": "region", "op": "==", "value": "North"}],
+         "group_by": ["country"],
+         "aggregations": [{"column": "amount", "func": "sum"}, {"column": "*", "func": "count"}],
+         "sort": [{"column": "sum_amount", "descending": true}],
+         "limit": 10}
+    """
+    for condition in plan.get("filters") or []:
+        frame = frame[_mask(frame, condition)]
+
+    group_by = list(plan.get("group_by") or [])
+    aggregations = plan.get("aggregations") or []
+    _check_columns(frame, group_by)
+
+    if aggregations:
+        named = {}
+        for aggregation in aggregations:
+            func = aggregation.get("func")
+            column = aggregation.get("column") or "*"
+            if func not in AGGREGATIONS:
+                raise PlanError(f"Unknown aggregation '{func}'")
+            if column != "*":
+                _check_columns(frame, [column])
+            name = aggregation.get("as") or ("count" if column == "*" else f"{func}_{column}")
+            named[name] = (column, func)
+
+        if group_by:
+            grouped = frame.groupby(group_by, dropna=False)
+            result = grouped.agg(**{
+                # Row counts need some column to count on; size() ignores its values
+                name: (group_by[0], "size") if column == "*" else (column, func)
+                for name, (column, func) in named.items()
+            }).reset_index()
+        else:
+            result = pd.DataFrame([{
+                name: len(frame) if column == "*" else getattr(frame[column], func)()
+                for name, (column, func) in named.items()
+            }])
+    else:
+        columns = list(plan.get("columns") or [])
+        _check_columns(frame, columns)
+        result = frame[group_by + [c for c in columns if c not in group_by]] if columns or group_by else frame
+        if group_by:
+            result = result.drop_duplicates()
+
+    sort = plan.get("sort") or []
+    if isinstance(sort, dict):
+        sort = [sort]
+    if sort:
+        _check_columns(result, [key.get("column") for key in sort])
+        result = result.sort_values(
+            [key["column"] for key in sort],
+            ascending=[not key.get("descending", False) for key in sort]
+        )
+
+    total = len(result)
+    limit = plan.get("limit")
+    limit = min(int(limit), max_rows) if isinstance(limit, (int, float)) and limit > 0 else max_rows
+    return result.head(limit), total
+
+
+def _mask(frame: pd.DataFrame, condition: Dict[str, Any]) -> pd.Series:
+    column, op, value = condition.get("column"), condition.get("op"), condition.get("value")
+    _check_columns(frame, [column])
+    if op not in FILTER_OPS:
+        raise PlanError(f"Unknown filter operator '{op}'")
+
+    series = frame[column]
+    if op == "contains":
+        return series.astype(str).str.contains(str(value), case=False, regex=False, na=False)
+    if op == "in":
+        values = value if isinstance(value, list) else [value]
+        if pd.api.types.is_numeric_dtype(series):
+            return series.isin([_coerce(series, v) for v in values])
+        return series.astype(str).str.lower().isin([str(v).lower() for v in values])
+
+    value = _coerce(series, value)
+    if isinstance(value, str):
+        # Text compares case-insensitively, like a user would expect from a question
+        series, value = series.astype(str).str.lower(), value.lower()
+    return {
+        "==": series.__eq__, "!=": series.__ne__,
+        ">": series.__gt__, ">=": series.__ge__,
+        "<": series.__lt__, "<=": series.__le__,
+    }[op](value)
+
+
+def _coerce(series: pd.Series, value: Any) -> Any:
+    try:
+        if pd.api.types.is_numeric_dtype(series):
+            return float(value)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise PlanError(f"Value {value!r} does not match column '{series.name}' ({series.dtype})")
+    return str(value)
+
+
+def _check_columns(frame: pd.DataFrame, columns: List[Any]):
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        raise PlanError(f"Unknown column(s): {', '.join(map(str, missing))}")
+
+
+def format_table(frame: pd.DataFrame, total: int, separator: str = " | ") -> str:
+    """Plain-text table in the same layout as spreadsheet row batches"""
+    lines = [separator.join(map(str, frame.columns))]
+    lines.extend(separator.join(_format_value(value) for value in row) for row in frame.itertuples(index=False))
+    if total > len(frame):
+        lines.append(f"({len(frame)} of {total} result rows shown)")
+    return "\n".join(lines)
+
+
+def _format_value(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return ""
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        # Full precision, never scientific: the LLM repeats these numbers in its answer
+        return str(int(value)) if value.is_integer() else np.format_float_positional(value, trim="-")
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat(sep=" ").removesuffix(" 00:00:00")
+    return str(value)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compare TokenOffsetChunker with RecursiveCharacterTextSplitter on the pages
+of a directory of PDF and text files.
+
+Pages are extracted once up front (PDFs with the configured text backend),
+then each splitter chunks them with the ingestion settings (1000 tokens, 200
+overlap). Reports time, pages/sec, chunk counts and how many chunks are
+identical between the two:
+
+    python benchmarks/benchmark_chunking.py /path/to/files
+    python benchmarks/benchmark_chunking.py /path/to/files --model sentence-transformers/all-MiniLM-L12-v2 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from transformers import AutoTokenizer
+
+from app.utils.chunking import DEFAULT_SEPARATORS, TokenOffsetChunker
+from app.utils.pdf_extraction import DEFAULT_BACKEND, get_extractor
+
+
+def load_pages(paths, backend):
+    extractor = get_extractor(backend)
+    pages = []
+    for path in paths:
+        if path.endswith(".pdf"):
+            count = extractor.count_pages(path)
+            texts = extractor.extract_pages(path, 0, count)
+        else:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts = [f.read()]
+        pages.extend(
+            Document(page_content=text, metadata={"source": os.path.basename(path), "page": number})
+            for number, text in enumerate(texts, start=1)
+        )
+    return pages
+
+
+def run(splitter, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = splitter.split_documents(pages)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return chunks, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing PDF or .txt files (searched recursively)")
+    parser.add_argument("--model", default=os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L12-v2"), help="Tokenizer to count tokens with")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--pdf-backend", default=DEFAULT_BACKEND, help="PDF text extractor used to get the pages")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per splitter; the fastest is reported")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.directory).rglob("*") if p.suffix.lower() in (".pdf", ".txt"))
+    if not paths:
+        parser.error(f"No PDF or .txt files found in {args.directory}")
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    pages = load_pages(paths, args.pdf_backend)
+    chars = sum(len(page.page_content) for page in pages)
+    print(f"\n{len(paths)} files, {len(pages)} pages, {chars} characters, tokenizer {args.model}\n")
+
+    recursive = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        tokenizer=tokenizer,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        strip_whitespace=True,
+        separators=DEFAULT_SEPARATORS
+    )
+    offsets = TokenOffsetChunker(tokenizer, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    baseline, baseline_seconds = run(recursive, pages, args.repeat)
+    chunks, seconds = run(offsets, pages, args.repeat)
+
+    print(f"{'splitter':<12} {'seconds':>9} {'pages/s':>9} {'chunks':>8}")
+    for name, result, elapsed in (("recursive", baseline, baseline_seconds), ("offsets", chunks, seconds)):
+        rate = len(pages) / elapsed if elapsed else 0
+        print(f"{name:<12} {elapsed:>9.3f} {rate:>9.1f} {len(result):>8}")
+
+    identical = sum(1 for a, b in zip(baseline, chunks) if a.page_content == b.page_content and a.metadata == b.metadata)
+    speedup = baseline_seconds / seconds if seconds else 0
+    print(f"\n{speedup:.1f}x faster; {identical}/{max(len(baseline), len(chunks))} chunks identical")
+    if identical != len(baseline) or len(baseline) != len(chunks):
+        # Older langchain releases count len(tokenizer.encode(piece)), special tokens included
+        print("Chunks differ: if your langchain counts special tokens, compare with count_special_tokens=True")
+
+
+if __name__ == "__main__":
+    main()
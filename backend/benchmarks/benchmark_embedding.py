@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measure embedding throughput (chunks/sec) against batch size on this host.
+
+The files of a directory (PDF and .txt) are chunked with the ingestion
+settings, then embedded with SentenceTransformer.encode, as the LangChain
+wrapper does, and with the length-bucketed EmbeddingEngine, once per batch
+size. Reports chunks/sec, the share of each forward pass spent on padding
+and the largest difference between the two sets of vectors:
+
+    python benchmarks/benchmark_embedding.py /path/to/files
+    python benchmarks/benchmark_embedding.py /path/to/files --batch-sizes 16,32,64,128 --threads 4 --limit 2000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+from app.utils.chunking import TokenOffsetChunker
+from app.utils.embedding_engine import EmbeddingEngine
+from app.utils.pdf_extraction import DEFAULT_BACKEND
+from benchmark_chunking import load_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing PDF or .txt files (searched recursively)")
+    parser.add_argument("--model", default=os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L12-v2"))
+    parser.add_argument("--batch-sizes", default="8,16,32,64,128", help="Comma-separated batch sizes to try")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--limit", type=int, default=0, help="Embed at most this many chunks (0 = all)")
+    parser.add_argument("--pdf-backend", default=DEFAULT_BACKEND, help="PDF text extractor used to get the pages")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.directory).rglob("*") if p.suffix.lower() in (".pdf", ".txt"))
+    if not paths:
+        parser.error(f"No PDF or .txt files found in {args.directory}")
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    model = SentenceTransformer(args.model, device="cpu")
+    chunker = TokenOffsetChunker(model.tokenizer, chunk_size=1000, chunk_overlap=200, add_token_counts=True)
+    chunks = chunker.split_documents(load_pages(paths, args.pdf_backend))
+    if args.limit:
+        chunks = chunks[:args.limit]
+    texts = [chunk.page_content for chunk in chunks]
+    lengths = [chunk.metadata["token_count"] for chunk in chunks]
+    print(
+        f"\n{len(paths)} files, {len(texts)} chunks, model {args.model} "
+        f"(max_seq_length {model.max_seq_length}), {torch.get_num_threads()} torch threads\n"
+    )
+
+    # Warm up so the first measured run does not pay for lazy initialisation
+    model.encode(texts[:8])
+
+    print(f"{'batch':>6} {'encode/s':>10} {'engine/s':>10} {'speedup':>8} {'padding':>8} {'max diff':>10}")
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        start = time.perf_counter()
+        baseline = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+        encode_seconds = time.perf_counter() - start
+
+        engine = EmbeddingEngine(model, batch_size=batch_size)
+        start = time.perf_counter()
+        matrix = engine.embed(texts, lengths)
+        engine_seconds = time.perf_counter() - start
+
+        stats = engine.stats()
+        print(
+            f"{batch_size:>6} {len(texts) / encode_seconds:>10.1f} {len(texts) / engine_seconds:>10.1f} "
+            f"{encode_seconds / engine_seconds:>7.2f}x {stats['padding_ratio']:>8.1%} "
+            f"{float(np.abs(baseline - matrix).max()):>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
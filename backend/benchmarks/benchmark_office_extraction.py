@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare native Office extraction with the convert-to-PDF path on a directory
+of DOCX/PPTX/XLSX files. XLSX goes through the row-batch spreadsheet
+extractor, as it does on ingestion.
+
+The PDF path converts each file with LibreOffice (soffice --headless) and
+extracts the PDF's text with the configured backend; it is skipped when
+soffice is not installed. Reports time per file, sections/pages and
+extracted character counts:
+
+    python benchmarks/benchmark_office_extraction.py /path/to/files
+    python benchmarks/benchmark_office_extraction.py /path/to/files --pdf-backend pdfium
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.office_extraction import EXTRACTORS, iter_sections
+from app.utils.pdf_extraction import DEFAULT_BACKEND, get_extractor
+from app.utils.spreadsheet_extraction import iter_row_batches
+
+EXTENSIONS = [*EXTRACTORS, "xlsx"]
+
+
+def run_native(path, extension):
+    start = time.perf_counter()
+    sections = list(iter_row_batches(path, extension) if extension == "xlsx" else iter_sections(path, extension))
+    return {
+        "seconds": time.perf_counter() - start,
+        "units": len(sections),
+        "chars": sum(len(text) for text, _ in sections)
+    }
+
+
+def run_pdf(path, soffice, backend):
+    extractor = get_extractor(backend)
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        subprocess.run(
+            [soffice, "--headless", "--convert-to", "pdf", "--outdir", out_dir, path],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=600
+        )
+        converted = time.perf_counter()
+        pdf_path = os.path.join(out_dir, Path(path).with_suffix(".pdf").name)
+        pages = extractor.count_pages(pdf_path)
+        chars = sum(len(text) for text in extractor.extract_pages(pdf_path, 0, pages))
+        return {
+            "seconds": time.perf_counter() - start,
+            "convert_seconds": converted - start,
+            "units": pages,
+            "chars": chars
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing Office files (searched recursively)")
+    parser.add_argument("--pdf-backend", default=DEFAULT_BACKEND, help="PDF text extractor for the PDF path")
+    parser.add_argument("--soffice", default=shutil.which("soffice") or shutil.which("libreoffice"), help="LibreOffice binary")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.directory).rglob("*") if p.suffix.lstrip(".").lower() in EXTENSIONS)
+    if not paths:
+        parser.error(f"No {'/'.join(EXTENSIONS)} files found in {args.directory}")
+    if not args.soffice:
+        print("LibreOffice not found, skipping the PDF path")
+
+    totals = {"native": 0.0, "pdf": 0.0}
+    print(f"\n{'file':<40} {'native s':>9} {'sections':>9} {'chars':>9} {'pdf s':>9} {'convert s':>10} {'pages':>6} {'chars':>9}")
+    for path in paths:
+        extension = Path(path).suffix.lstrip(".").lower()
+        try:
+            native = run_native(path, extension)
+            totals["native"] += native["seconds"]
+            native_cols = f"{native['seconds']:>9.3f} {native['units']:>9} {native['chars']:>9}"
+        except Exception as e:
+            native_cols = f"{'error: ' + str(e)[:27]:>29}"
+
+        pdf_cols = f"{'n/a':>9} {'':>10} {'':>6} {'':>9}"
+        if args.soffice:
+            try:
+                pdf = run_pdf(path, args.soffice, args.pdf_backend)
+                totals["pdf"] += pdf["seconds"]
+                pdf_cols = f"{pdf['seconds']:>9.3f} {pdf['convert_seconds']:>10.3f} {pdf['units']:>6} {pdf['chars']:>9}"
+            except Exception as e:
+                pdf_cols = f"{'error: ' + str(e)[:30]:>36}"
+
+        print(f"{os.path.basename(path)[:40]:<40} {native_cols} {pdf_cols}")
+
+    print(f"\n{len(paths)} files: native {totals['native']:.2f}s", end="")
+    if args.soffice:
+        speedup = totals["pdf"] / totals["native"] if totals["native"] else 0
+        print(f", via PDF {totals['pdf']:.2f}s ({speedup:.1f}x slower)")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Compare the PDF text-extraction backends on a directory of PDFs.
+
+Each backend runs in a fresh process so its peak memory is measured in
+isolation. Reports pages/sec, peak RSS and extracted character counts:
+
+    python benchmarks/benchmark_pdf_extractors.py /path/to/pdfs
+    python benchmarks/benchmark_pdf_extractors.py /path/to/pdfs --backends pypdf pdfium --per-file
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.pdf_extraction import EXTRACTORS, available_extractors, get_extractor
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+
+
+def run_backend(backend, paths, queue):
+    extractor = get_extractor(backend)
+    baseline_mb = peak_rss_mb()
+    files = []
+    start = time.perf_counter()
+    for path in paths:
+        file_start = time.perf_counter()
+        try:
+            pages = extractor.count_pages(path)
+            chars = sum(len(text) for text in extractor.extract_pages(path, 0, pages))
+            files.append({"file": os.path.basename(path), "pages": pages, "chars": chars,
+                          "seconds": time.perf_counter() - file_start, "error": None})
+        except Exception as e:
+            files.append({"file": os.path.basename(path), "pages": 0, "chars": 0,
+                          "seconds": time.perf_counter() - file_start, "error": str(e)})
+    queue.put({
+        "backend": backend,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+        "baseline_rss_mb": baseline_mb,
+        "files": files
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory containing PDF files (searched recursively)")
+    parser.add_argument("--backends", nargs="+", default=None, help=f"Backends to run (default: all installed of {', '.join(EXTRACTORS)})")
+    parser.add_argument("--per-file", action="store_true", help="Print per-file character counts for quality comparison")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.directory).rglob("*.pdf"))
+    if not paths:
+        parser.error(f"No PDF files found in {args.directory}")
+
+    backends = args.backends or available_extractors()
+    missing = [name for name in backends if name not in available_extractors()]
+    if missing:
+        print(f"Skipping unavailable backends: {', '.join(missing)}")
+        backends = [name for name in backends if name not in missing]
+
+    results = []
+    for backend in backends:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run_backend, args=(backend, paths, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    print(f"\n{len(paths)} PDF files from {args.directory}\n")
+    print(f"{'backend':<10} {'pages':>7} {'seconds':>9} {'pages/s':>9} {'peak MB':>9} {'chars':>12} {'errors':>7}")
+    for result in results:
+        pages = sum(f["pages"] for f in result["files"])
+        chars = sum(f["chars"] for f in result["files"])
+        errors = sum(1 for f in result["files"] if f["error"])
+        rate = pages / result["seconds"] if result["seconds"] else 0
+        print(f"{result['backend']:<10} {pages:>7} {result['seconds']:>9.2f} {rate:>9.1f} "
+              f"{result['peak_rss_mb']:>9.1f} {chars:>12} {errors:>7}")
+
+    if args.per_file:
+        print(f"\n{'file':<40} " + " ".join(f"{r['backend']:>12}" for r in results))
+        for i, path in enumerate(paths):
+            row = []
+            for result in results:
+                entry = result["files"][i]
+                row.append("error" if entry["error"] else str(entry["chars"]))
+            print(f"{os.path.basename(path)[:40]:<40} " + " ".join(f"{value:>12}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
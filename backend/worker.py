@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Standalone ingestion worker.
+
+Pulls document processing jobs from the Postgres queue (JOB_QUEUE_BACKEND=postgres)
+and runs the same pipeline as the API, so API nodes and worker nodes can be
+scaled independently. Run as many of these as the hardware allows:
+
+    python worker.py
+"""
+import asyncio
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Extraction and OCR pool processes are spawned, and spawn re-imports this file
+# as __mp_main__: only the worker itself loads the app (config clients, schema
+# DDL, MinIO), so pool processes import nothing but the modules they run.
+if __name__ == "__main__":
+    from app.config import JOB_HEARTBEAT_SECONDS, JOB_POLL_INTERVAL, MODEL_WARMUP, OCR_WARMUP, OCR_WORKERS
+    from app.db.database import SessionLocal
+    from app.services.job_queue import job_queue
+    from app.services.processing_service import process_uploaded_file
+    from app.middleware.error_handler import CustomHTTPException, ValidationException, ProcessingCancelled
+    from app.utils.logger import log_info, log_error, log_warning, log_performance
+
+
+class Worker:
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+
+    def stop(self, *_):
+        log_info("Stop requested, finishing current job", context="worker", worker_id=self.worker_id)
+        self.stopping.set()
+
+    def run(self):
+        log_info("Worker started", context="worker", worker_id=self.worker_id)
+        if OCR_WARMUP or MODEL_WARMUP:
+            self.warm_up()
+        while not self.stopping.is_set():
+            try:
+                job = job_queue.claim(self.worker_id)
+            except Exception as e:
+                log_error(e, context="worker_claim", worker_id=self.worker_id)
+                job = None
+
+            if job is None:
+                self.stopping.wait(JOB_POLL_INTERVAL)
+                continue
+
+            try:
+                self.run_job(job)
+            except Exception as e:
+                log_error(e, context="worker_job", job_id=job["job_id"], worker_id=self.worker_id)
+        log_info("Worker stopped", context="worker", worker_id=self.worker_id)
+
+    def warm_up(self):
+        """Load the models and OCR engines before claiming work, so the first job doesn't stall on them"""
+        try:
+            if MODEL_WARMUP:
+                from app.utils.model_registry import warm_up_models
+                warm_up_models()
+            if OCR_WARMUP:
+                from app.services.ocr_service import warm_up_ocr
+                warm_up_ocr(OCR_WORKERS)
+        except Exception as e:
+            log_error(e, context="worker_warmup", worker_id=self.worker_id)
+
+    def run_job(self, job):
+        job_id = job["job_id"]
+        start_time = time.time()
+        state = {"stage": job.get("stage"), "progress": dict(job.get("progress") or {})}
+        state_lock = threading.Lock()
+        done = threading.Event()
+        # Set once another worker may own the job: processing stops at its next
+        # progress update and nothing more is written for it
+        lease_lost = threading.Event()
+
+        def progress(stage=None, **counters):
+            if lease_lost.is_set():
+                raise ProcessingCancelled(f"Lease lost for job {job_id}")
+            with state_lock:
+                if stage:
+                    state["stage"] = stage
+                state["progress"].update(counters)
+
+        def heartbeat():
+            # Progress is flushed with each heartbeat, which bounds write load on Postgres
+            interval = max(1, min(JOB_HEARTBEAT_SECONDS, 5))
+            last_beat = 0.0
+            last_written = None
+            while not done.wait(interval):
+                with state_lock:
+                    snapshot = (state["stage"], dict(state["progress"]))
+                if snapshot == last_written and time.time() - last_beat < JOB_HEARTBEAT_SECONDS:
+                    continue
+                try:
+                    if not job_queue.heartbeat(job_id, self.worker_id, stage=snapshot[0], progress=snapshot[1]):
+                        log_warning("Lease lost for job, stopping it", context="worker", job_id=job_id, worker_id=self.worker_id)
+                        lease_lost.set()
+                        return
+                    last_beat = time.time()
+                    last_written = snapshot
+                except Exception as e:
+                    log_error(e, context="worker_heartbeat", job_id=job_id)
+
+        beat = threading.Thread(target=heartbeat, name=f"heartbeat-{job_id}", daemon=True)
+        beat.start()
+
+        db = SessionLocal()
+        try:
+            result = asyncio.run(process_uploaded_file(
+                job["file_id"],
+                job["user_id"],
+                db,
+                request_id=job_id,
+                progress=progress
+            ))
+            done.set()
+            beat.join()
+            if lease_lost.is_set():
+                raise ProcessingCancelled(f"Lease lost for job {job_id}")
+            with state_lock:
+                job_queue.heartbeat(job_id, self.worker_id, stage=state["stage"], progress=state["progress"])
+            job_queue.complete(job_id, self.worker_id, result)
+            log_performance(
+                "Queued processing job completed",
+                time.time() - start_time,
+                job_id=job_id,
+                worker_id=self.worker_id
+            )
+        except ProcessingCancelled:
+            done.set()
+            log_warning("Job abandoned after losing its lease", context="worker", job_id=job_id, worker_id=self.worker_id)
+        except ValidationException as e:
+            # Bad input will not get better on retry
+            done.set()
+            if not lease_lost.is_set():
+                job_queue.fail(job_id, self.worker_id, e.detail, retryable=False)
+        except CustomHTTPException as e:
+            done.set()
+            if not lease_lost.is_set():
+                job_queue.fail(job_id, self.worker_id, e.detail)
+        except Exception as e:
+            done.set()
+            log_error(e, context="worker_job", job_id=job_id, worker_id=self.worker_id)
+            if not lease_lost.is_set():
+                job_queue.fail(job_id, self.worker_id, str(e))
+        finally:
+            done.set()
+            db.close()
+
+
+def main():
+    """Main function to start a worker"""
+    worker = Worker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    print(f"Starting ingestion worker {worker.worker_id}...")
+    try:
+        worker.run()
+    finally:
+        ocr_module = sys.modules.get("app.services.ocr_service")
+        if ocr_module is not None:
+            ocr_module.shutdown_ocr_pool()
+
+
+if __name__ == "__main__":
+    main()